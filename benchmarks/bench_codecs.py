@@ -0,0 +1,73 @@
+"""
+Compares encode time and embedded payload size of images converted to base64
+for each output codec supported by `img_format` param.
+
+Usage:
+```
+python benchmarks/bench_codecs.py [--repeats 5] [--widths 0 375]
+```
+Width `0` means no resizing.
+"""  # NOQA E501
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(".")
+sys.path.append("../.")
+from ipyplot._img_helpers import _img_to_data_uri  # NOQA E402
+
+
+# None keeps files which don't need resizing as they are
+FORMATS = [None, 'png', 'jpeg', 'webp', 'auto']
+
+
+def _synthetic_photo(size: int = 1024, seed: int = 0):
+    # smooth gradients with sensor-like noise resemble camera frames
+    rng = np.random.RandomState(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    img = np.stack([x, y, (x + y) / 2], axis=-1) * 200
+    img += rng.normal(0, 12, img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def _synthetic_graphic(size: int = 1024):
+    # few flat colors, e.g. segmentation masks or charts
+    img = np.zeros((size, size, 3), dtype=np.uint8)
+    img[size // 4:size // 2, :] = (255, 0, 0)
+    img[:, size // 3:size // 2] = (0, 0, 255)
+    return img
+
+
+def run(repeats: int = 5, widths: list = (0, 375)):
+    images = {
+        'photo-1024px': _synthetic_photo(),
+        'graphic-1024px': _synthetic_graphic(),
+        'screenshot': 'docs/example2-images.jpg',
+    }
+
+    print('%-16s %6s %6s %12s %12s' % (
+        'image', 'width', 'format', 'time [ms]', 'size [KB]'))
+    for name, image in images.items():
+        for width in widths:
+            for img_format in FORMATS:
+                times = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    uri = _img_to_data_uri(
+                        image, target_width=width or None,
+                        img_format=img_format)
+                    times.append(time.perf_counter() - start)
+                print('%-16s %6s %6s %12.2f %12.1f' % (
+                    name, width or '-', img_format,
+                    np.median(times) * 1000, len(uri) / 1024))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--widths', type=int, nargs='+', default=[0, 375])
+    args = parser.parse_args()
+    run(args.repeats, args.widths)
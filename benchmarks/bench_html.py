@@ -0,0 +1,88 @@
+"""
+Measures time spent on building HTML code (without image conversion)
+and compares it with the previous approach based on string concatenation
+and per-image UUIDs.
+
+Usage:
+```
+python benchmarks/bench_html.py [--repeats 5] [--sizes 1000 10000]
+```
+"""  # NOQA E501
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import shortuuid
+
+sys.path.append(".")
+sys.path.append("../.")
+from ipyplot._html_helpers import _create_imgs_grid, _get_html_ids  # NOQA E402
+
+
+def _legacy_create_img(src: str, label: str, grid_uuid: str):
+    # previous per-image code path: random uuid and named template
+    img_uuid = shortuuid.uuid()
+    img_html = '<img src="%s"/>' % src
+    return """
+    <div class="ipyplot-placeholder-div-%(0)s">
+        <div id="ipyplot-content-div-%(0)s-%(1)s" class="ipyplot-content-div-%(0)s">
+            <h4 style="font-size: 12px; word-wrap: break-word;">%(2)s</h4>
+            %(3)s
+            <a href="#!">
+                <span class="ipyplot-img-close"/>
+            </a>
+            <a href="#ipyplot-content-div-%(0)s-%(1)s">
+                <span class="ipyplot-img-expand"/>
+            </a>
+        </div>
+    </div>
+    """ % {'0': grid_uuid, '1': img_uuid, '2': label, '3': img_html}  # NOQA E501
+
+
+def _legacy_create_imgs_grid(srcs: list, labels: list):
+    grid_uuid = shortuuid.uuid()
+    html = '<div id="ipyplot-imgs-container-div-%s">' % grid_uuid
+    for src, label in zip(srcs, labels):
+        html += _legacy_create_img(src, label, grid_uuid)
+    html += '</div>'
+    return html
+
+
+def _median_time(func, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return np.median(times)
+
+
+def run(repeats: int = 5, sizes: list = (1000, 10000)):
+    print('%-8s %-14s %12s' % ('images', 'step', 'time [ms]'))
+    for size in sizes:
+        # precomputed sources so that only HTML building is measured
+        srcs = ['data:image/png;base64,AAAA'] * size
+        labels = list(range(size))
+
+        results = {
+            'uuid': lambda: [shortuuid.uuid() for _ in range(size)],
+            'counter ids': lambda: [
+                i for i, _ in zip(_get_html_ids(), range(size))],
+            'legacy grid': lambda: _legacy_create_imgs_grid(srcs, labels),
+            'grid': lambda: _create_imgs_grid(
+                srcs, labels, max_images=size, img_srcs=srcs,
+                show_url=False, lazy_loading=False),
+        }
+        for step, func in results.items():
+            print('%-8d %-14s %12.2f' % (
+                size, step, _median_time(func, repeats) * 1000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+    run(args.repeats, args.sizes)
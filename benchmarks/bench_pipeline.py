@@ -0,0 +1,276 @@
+"""
+Benchmark suite for the rendering pipeline (`_create_imgs_grid`, `_create_tabs`,
+`_img_to_base64` and `_get_class_representations`) on synthetic datasets
+of varying number of images, number of classes, image size, dtype and input type.
+Reports median wall time, peak memory allocated by python (tracemalloc) and size of the output.
+
+Results can be saved and compared with a baseline to catch performance regressions:
+```
+python benchmarks/bench_pipeline.py --save baseline.json
+# ...apply changes...
+python benchmarks/bench_pipeline.py --compare baseline.json [--threshold 1.25]
+```
+The comparison exits with status 1 if time, memory or output size of any case
+got worse than `threshold` times the baseline.
+
+Usage:
+```
+python benchmarks/bench_pipeline.py [--repeats 5] [--quick] [--only grid tabs]
+```
+"""  # NOQA E501
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(".")
+sys.path.append("../.")
+from ipyplot._cache import configure_cache  # NOQA E402
+from ipyplot._html_helpers import _create_imgs_grid, _create_tabs  # NOQA E402
+from ipyplot._img_helpers import _img_to_base64  # NOQA E402
+from ipyplot._utils import _get_class_representations  # NOQA E402
+
+
+INPUT_TYPES = ['path', 'pil', 'ndarray']
+
+# params of benchmark cases, every combination is measured
+SUITES = {
+    'grid': {
+        'n': [100, 1000],
+        'size': [64],
+        'dtype': ['uint8'],
+        'input': INPUT_TYPES,
+        'force_b64': [False, True],
+    },
+    'tabs': {
+        'n': [1000],
+        'classes': [2, 10, 100],
+        'size': [64],
+        'input': ['path', 'ndarray'],
+        'force_b64': [False, True],
+    },
+    'img_to_base64': {
+        'size': [64, 256, 1024],
+        'dtype': ['uint8', 'float32'],
+        'input': INPUT_TYPES,
+    },
+    'class_representations': {
+        'n': [10000, 100000],
+        'classes': [10, 1000],
+    },
+}
+
+# time differences below this are treated as noise when comparing results
+MIN_TIME_DELTA_MS = 1.0
+
+QUICK_SUITES = {
+    'grid': {'n': [100], 'input': ['path', 'ndarray']},
+    'tabs': {'n': [200], 'classes': [10]},
+    'img_to_base64': {'size': [64, 256], 'input': ['path', 'ndarray']},
+    'class_representations': {'n': [10000]},
+}
+
+
+class _Dataset(object):
+    """Synthetic images written to a temporary directory when paths are requested."""  # NOQA E501
+
+    def __init__(self, tmp_dir: str):
+        self.tmp_dir = tmp_dir
+        self._cache = {}
+
+    def images(self, n: int, size: int, dtype: str, input_type: str):
+        key = (n, size, dtype, input_type)
+        if key not in self._cache:
+            self._cache[key] = self._create(*key)
+        return self._cache[key]
+
+    def _create(self, n: int, size: int, dtype: str, input_type: str):
+        rng = np.random.RandomState(0)
+        # every image is unique, so that nothing is deduplicated
+        base = rng.randint(0, 255, (size, size, 3)).astype(np.uint8)
+        arrays = [np.roll(base, i, axis=1) for i in range(n)]
+
+        if input_type == 'ndarray':
+            if dtype == 'float32':
+                return [(a / 255).astype(np.float32) for a in arrays]
+            return arrays
+        if input_type == 'pil':
+            return [Image.fromarray(a) for a in arrays]
+
+        paths = []
+        for i, a in enumerate(arrays):
+            path = os.path.join(
+                self.tmp_dir, '%d-%d-%d.png' % (n, size, i))
+            if not os.path.exists(path):
+                Image.fromarray(a).save(path)
+            paths.append(path)
+        return paths
+
+
+def _labels(n: int, classes: int):
+    return [i % classes for i in range(n)]
+
+
+def _create_case(suite: str, params: dict, dataset: _Dataset):
+    # returns function running the benchmarked step (without preparing inputs)
+    n = params.get('n', 1)
+    size = params.get('size', 64)
+    dtype = params.get('dtype', 'uint8')
+    input_type = params.get('input', 'ndarray')
+    force_b64 = params.get('force_b64', False)
+
+    if suite == 'grid':
+        images = dataset.images(n, size, dtype, input_type)
+        return lambda: _create_imgs_grid(
+            images, list(range(n)), max_images=n, force_b64=force_b64)
+    if suite == 'tabs':
+        images = dataset.images(n, size, dtype, input_type)
+        labels = _labels(n, params['classes'])
+        return lambda: _create_tabs(
+            images, labels, max_imgs_per_tab=30, force_b64=force_b64)
+    if suite == 'img_to_base64':
+        image = dataset.images(1, size, dtype, input_type)[0]
+        return lambda: _img_to_base64(image, target_width=375)
+    if suite == 'class_representations':
+        images = np.array(['%d.png' % i for i in range(n)])
+        labels = _labels(n, params['classes'])
+        return lambda: _get_class_representations(images, labels)
+    raise ValueError("Unknown suite '%s'" % suite)
+
+
+def _output_size(out):
+    # size of HTML code or base64 string
+    return len(out) if isinstance(out, str) else 0
+
+
+def _measure(func, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = func()
+        times.append(time.perf_counter() - start)
+
+    # memory is measured in a separate run as tracing slows the code down
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'time_ms': float(np.median(times)) * 1000,
+        'peak_mb': peak / 2 ** 20,
+        'output_kb': _output_size(out) / 1024,
+    }
+
+
+def _case_name(suite: str, params: dict):
+    return suite + '[' + ','.join(
+        '%s=%s' % (k, v) for k, v in params.items()) + ']'
+
+
+def _is_redundant(params: dict):
+    # files are always 8-bit and force_b64 affects only string URLs
+    if params.get('input', 'ndarray') != 'ndarray' \
+            and params.get('dtype', 'uint8') != 'uint8':
+        return True
+    return params.get('input') != 'path' and params.get('force_b64', False)
+
+
+def _iter_cases(suites: dict):
+    for suite, grid in suites.items():
+        keys = list(grid)
+        for values in itertools.product(*[grid[k] for k in keys]):
+            params = dict(zip(keys, values))
+            if not _is_redundant(params):
+                yield suite, params
+
+
+def _compare(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    print('\n%-72s %8s %8s %8s' % ('case', 'time', 'memory', 'output'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratios = []
+        for metric in ('time_ms', 'peak_mb', 'output_kb'):
+            base = baseline[name][metric]
+            ratio = result[metric] / base if base > 0 else 1.0
+            ratios.append(ratio)
+            if metric == 'time_ms' \
+                    and result[metric] - base < MIN_TIME_DELTA_MS:
+                continue
+            if ratio > threshold:
+                regressions.append((name, metric, ratio))
+        print('%-72s %7.2fx %7.2fx %7.2fx' % ((name,) + tuple(ratios)))
+
+    for name, metric, ratio in regressions:
+        print('REGRESSION: %s %s is %.2fx the baseline' % (
+            name, metric, ratio))
+    return len(regressions) == 0
+
+
+def run(
+        repeats: int = 5,
+        quick: bool = False,
+        only: list = None,
+        save: str = None,
+        compare: str = None,
+        threshold: float = 1.25):
+    suites = {k: dict(v) for k, v in SUITES.items()}
+    if quick:
+        for suite, params in QUICK_SUITES.items():
+            suites[suite].update(params)
+    if only:
+        suites = {k: v for k, v in suites.items() if k in only}
+
+    # conversions would be served from cache after the first repeat
+    configure_cache(enabled=False)
+
+    results = {}
+    print('%-72s %10s %10s %11s' % (
+        'case', 'time [ms]', 'peak [MB]', 'output [KB]'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset = _Dataset(tmp_dir)
+        for suite, params in _iter_cases(suites):
+            name = _case_name(suite, params)
+            result = _measure(_create_case(suite, params, dataset), repeats)
+            results[name] = result
+            print('%-72s %10.2f %10.2f %11.1f' % (
+                name, result['time_ms'], result['peak_mb'],
+                result['output_kb']))
+
+    if save:
+        with open(save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        return _compare(results, baseline, threshold)
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument(
+        '--quick', action='store_true',
+        help='smaller datasets, e.g. for CI')
+    parser.add_argument(
+        '--only', nargs='+', choices=list(SUITES),
+        help='run only selected suites')
+    parser.add_argument('--save', help='save results to JSON file')
+    parser.add_argument('--compare', help='compare with saved results')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+    ok = run(
+        args.repeats, args.quick, args.only,
+        args.save, args.compare, args.threshold)
+    sys.exit(0 if ok else 1)
@@ -11,13 +11,56 @@ ipyplot.plot_images(images=images, labels=labels, ..)
 ```
 """  # NOQA E501
 
+import importlib as _importlib
 import sys as _sys
 
-from ._plotting import plot_images, plot_class_tabs, plot_class_representations
+# public functions are imported from their modules on first access (PEP 562),
+# so that `import ipyplot` doesn't load numpy, PIL, IPython etc. until they are needed  # NOQA E501
+_LAZY_ATTRIBUTES = {
+    'plot_images': '._plotting',
+    'plot_class_tabs': '._plotting',
+    'plot_class_representations': '._plotting',
+    'cache_info': '._cache',
+    'clear_cache': '._cache',
+    'configure_cache': '._cache',
+    'set_options': '._config',
+    'get_options': '._config',
+    'save_html': '._export',
+    'to_html': '._export',
+    'normalize_images': '._img_helpers',
+    'Pager': '._pager',
+    'profile': '._profiling',
+}
 
-__name__ = "IPyPlot"
+__all__ = list(_LAZY_ATTRIBUTES)
 __version__ = "1.1.2"
 
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        # `__name__` is overridden below, so `from ipyplot import _utils`
+        # can't fall back to importing submodules by itself
+        if name.startswith('_') and not name.startswith('__'):
+            try:
+                return _importlib.import_module('.' + name, __package__)
+            except ModuleNotFoundError as e:
+                if e.name != '%s.%s' % (__package__, name):
+                    raise
+        raise AttributeError(
+            "module %r has no attribute %r" % (__package__, name))
+    module = _importlib.import_module(_LAZY_ATTRIBUTES[name], __package__)
+    value = getattr(module, name)
+    # cache the attribute so __getattr__ is called only once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+__name__ = "IPyPlot"
+
 if 'google.colab' in _sys.modules:  # pragma: no cover
     print(
         """
@@ -0,0 +1,183 @@
+"""
+Helper methods for composing thumbnails of many images into a few tiled images (sprite sheets/atlases).
+Each atlas is embedded only once and displayed images are just CSS-positioned
+fragments of it, which saves per-image encoding overhead, payload and browser decode operations.
+"""  # NOQA E501
+
+import base64
+from concurrent.futures import Executor
+from functools import partial
+from typing import Sequence
+
+import numpy as np
+from numpy import str_
+import PIL
+
+from ._fetch import _fetch_urls
+from ._img_helpers import _encode_image, _to_pil
+from ._profiling import _profiled, _record_images
+from ._utils import _get_executor, _is_remote_url, _parallel_map
+
+# max width/height (in pixels) of a single atlas image
+_ATLAS_MAX_SIZE = 4096
+
+
+def _is_atlas_compatible(
+        image: str or str_ or np.ndarray or PIL.Image,
+        force_b64: bool = False):
+    """Checks if image can be composed into an atlas.
+    Remote URLs are downloaded only with `force_b64`, otherwise they can't be composed."""  # NOQA E501
+    return force_b64 or not _is_remote_url(image)
+
+
+@_profiled('decode')
+def _create_thumbnail(
+        image: str or str_ or bytes or np.ndarray or PIL.Image,
+        thumb_width: int):
+    """Converts image to RGB/RGBA PIL.Image downscaled to `thumb_width`.
+    Images narrower than `thumb_width` are kept in their original size (never upscaled).
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or bytes or numpy.ndarray or PIL.Image
+        Input image can be either PIL.Image, numpy.ndarray, content of an image file (e.g. downloaded one)
+        or simply a string URL to local image file.
+    thumb_width : int
+        Max thumbnail width in pixels.
+
+    Returns
+    -------
+    PIL.Image
+        Thumbnail image.
+    """  # NOQA E501
+    image = _to_pil(image, thumb_width)
+    has_alpha = 'A' in image.mode or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    w, h = image.size
+    thumb_width = min(thumb_width, w)
+    thumb_height = max(1, int(round(h * thumb_width / w)))
+    if (w, h) != (thumb_width, thumb_height):
+        image = image.resize((thumb_width, thumb_height))
+    return image
+
+
+def _pack_thumbnails(
+        sizes: Sequence[tuple],
+        max_size: int = _ATLAS_MAX_SIZE):
+    """Computes positions of thumbnails in atlases using simple shelf packing.
+
+    Parameters
+    ----------
+    sizes : Sequence[tuple]
+        List of thumbnail sizes (w, h).
+    max_size : int, optional
+        Max width/height of a single atlas.
+        Defaults to 4096.
+
+    Returns
+    -------
+    (list, list)
+        Returns a tuple of atlas sizes [(w, h), ...]
+        and thumbnails placements [(atlas_idx, x, y), ...].
+    """
+    atlases = []
+    placements = []
+    x = y = shelf_h = atlas_w = 0
+    for w, h in sizes:
+        if x + w > max_size:
+            # start new shelf
+            x, y = 0, y + shelf_h
+            shelf_h = 0
+        if y + h > max_size and (x > 0 or y > 0):
+            # start new atlas
+            atlases.append((atlas_w, y + shelf_h if x > 0 else y))
+            x = y = shelf_h = atlas_w = 0
+        placements.append((len(atlases), x, y))
+        x += w
+        atlas_w = max(atlas_w, x)
+        shelf_h = max(shelf_h, h)
+    if placements:
+        atlases.append((atlas_w, y + shelf_h))
+    return atlases, placements
+
+
+@_profiled('encode')
+def _create_atlases(
+        images: Sequence[object],
+        thumb_width: int,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        force_b64: bool = False):
+    """Composes thumbnails of images into one or a few atlas images.
+
+    Parameters
+    ----------
+    images : Sequence[object]
+        List of images to be composed.
+        Remote URLs are skipped unless `force_b64` is `True`.
+    thumb_width : int
+        Max width (in pixels) of each thumbnail in the atlas, smaller images are not upscaled.
+    img_format : str, optional
+        Output format for atlases, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    n_jobs : int, optional
+        Number of parallel workers used for creating thumbnails.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Either `'thread'`, `'process'` or a custom executor instance.
+        Defaults to `'thread'`.
+    force_b64 : bool, optional
+        Whether remote URLs should be downloaded and composed as well
+        (images which couldn't be downloaded are skipped).
+        Defaults to False.
+
+    Returns
+    -------
+    (list, list)
+        Returns a tuple of atlases as data URIs along with their sizes [(uri, (w, h)), ...]
+        and thumbnails placements [(atlas_idx, x, y, w, h) or None, ...]
+        (None for images which were not composed).
+    """  # NOQA E501
+    to_compose = [
+        i for i, image in enumerate(images)
+        if _is_atlas_compatible(image, force_b64)]
+    to_compose_imgs = [images[i] for i in to_compose]
+    remote = [
+        j for j, image in enumerate(to_compose_imgs) if _is_remote_url(image)]
+    fetched = _fetch_urls([to_compose_imgs[j] for j in remote])
+    for j, data in zip(remote, fetched):
+        to_compose_imgs[j] = data
+    kept = [j for j, image in enumerate(to_compose_imgs) if image is not None]
+    to_compose = [to_compose[j] for j in kept]
+
+    with _get_executor(n_jobs, parallel_backend) as executor:
+        thumbs = _parallel_map(
+            partial(_create_thumbnail, thumb_width=thumb_width),
+            [to_compose_imgs[j] for j in kept],
+            executor)
+
+    # thumbnails might have been created in other processes
+    import PIL.Image
+
+    atlas_sizes, placements = _pack_thumbnails([t.size for t in thumbs])
+    mode = 'RGBA' if any(t.mode == 'RGBA' for t in thumbs) else 'RGB'
+    atlases = [PIL.Image.new(mode, size, 'white') for size in atlas_sizes]
+    for thumb, (atlas_idx, x, y) in zip(thumbs, placements):
+        atlases[atlas_idx].paste(thumb, (x, y))
+
+    out = []
+    for atlas in atlases:
+        data, mime = _encode_image(atlas, None, img_format, quality)
+        out.append(('data:%s;base64,%s' % (
+            mime, base64.b64encode(data).decode('utf-8')), atlas.size))
+    _record_images(len(to_compose), len(to_compose), 0, [u for u, _ in out])
+
+    cells = [None] * len(images)
+    for i, thumb, (atlas_idx, x, y) in zip(to_compose, thumbs, placements):
+        cells[i] = (atlas_idx, x, y) + thumb.size
+    return out, cells
@@ -0,0 +1,252 @@
+"""
+Cache for images converted to base64 data URIs.
+Allows to skip decoding, resizing and encoding of images which were already converted before,
+e.g. when the same notebook cell is re-run.
+"""  # NOQA E501
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy import str_
+import PIL
+
+from ._utils import _is_pil_image, _is_remote_url
+
+
+class _B64Cache(object):
+    """Thread-safe LRU cache with size-in-bytes eviction and an optional on-disk tier.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Max total size (in bytes) of values kept in memory.
+        Least recently used entries are evicted once the limit is exceeded.
+        Defaults to 128MB.
+    disk_dir : str, optional
+        Directory for the on-disk tier. Entries evicted from memory
+        (and entries from previous sessions) are still served from there.
+        If None only in-memory cache is used.
+        Defaults to None.
+    enabled : bool, optional
+        Whether the cache is used at all.
+        Defaults to True.
+    """  # NOQA E501
+
+    def __init__(
+            self,
+            max_bytes: int = 128 * 1024 ** 2,
+            disk_dir: str = None,
+            enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Returns cached value for `key` or None if it's not cached."""
+        if not self.enabled or key is None:
+            return None
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: str):
+        """Stores `value` under `key` in memory and on disk (if enabled)."""
+        if not self.enabled or key is None:
+            return
+        with self._lock:
+            self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        """Removes all in-memory entries and resets counters.
+        On-disk entries are left untouched."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Returns dictionary with cache statistics."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'disk_dir': self.disk_dir,
+            }
+
+    def _put_memory(self, key: str, value: str):
+        # has to be called with self._lock acquired
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(value) > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._size += len(value)
+        self._evict()
+
+    def set_max_bytes(self, max_bytes: int):
+        """Sets the size limit evicting least recently used entries if it's exceeded."""  # NOQA E501
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        # has to be called with self._lock acquired
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _disk_path(self, key: str):
+        return os.path.join(self.disk_dir, key + '.b64')
+
+    def _read_disk(self, key: str):
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, value: str):
+        # on-disk tier is best-effort, e.g. read-only or full `disk_dir`
+        # only means that entries are not persisted
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = '%s.%s.tmp' % (path, threading.get_ident())
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+_CACHE = _B64Cache()
+
+
+def _cache_key(image: str or str_ or np.ndarray or PIL.Image, *params):
+    """Computes cache key for an image and its conversion params.
+    String URLs are identified by absolute path, modification time and file size
+    (remote URLs simply by the URL), numpy.ndarray and PIL.Image objects by a hash of their pixel buffer.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or numpy.ndarray or PIL.Image
+        Input image object or string URL to local image file.
+    *params
+        Additional conversion params (e.g. target width) which affect the output.
+
+    Returns
+    -------
+    str or None
+        Hex digest to be used as a cache key
+        or None if the image can't be cached.
+    """  # NOQA E501
+    h = hashlib.blake2b(digest_size=20)
+    if _is_remote_url(image):
+        h.update(b'url')
+        h.update(image.encode('utf-8'))
+    elif type(image) is str or type(image) is str_:
+        try:
+            stat = os.stat(image)
+        except OSError:
+            return None
+        h.update(b'path')
+        h.update(os.path.abspath(image).encode('utf-8'))
+        h.update(repr((stat.st_mtime_ns, stat.st_size)).encode('utf-8'))
+    elif isinstance(image, np.ndarray):
+        h.update(b'ndarray')
+        h.update(repr((image.shape, image.dtype.str)).encode('utf-8'))
+        h.update(memoryview(np.ascontiguousarray(image)).cast('B'))
+    elif _is_pil_image(image):
+        h.update(b'pil')
+        h.update(repr((image.mode, image.size)).encode('utf-8'))
+        h.update(image.tobytes())
+        # pixels of palette images are just indices into the palette
+        h.update(repr((
+            image.getpalette(), image.info.get('transparency'))
+        ).encode('utf-8'))
+    else:
+        return None
+    h.update(repr(params).encode('utf-8'))
+    return h.hexdigest()
+
+
+def cache_info():
+    """Returns statistics of the cache used for images converted to base64.
+
+    Returns
+    -------
+    dict
+        Dictionary with `hits`, `disk_hits`, `misses`, `entries`,
+        `size_bytes`, `max_bytes`, `disk_dir` and `enabled` keys.
+    """
+    return _CACHE.info()
+
+
+def clear_cache():
+    """Removes all in-memory entries from the cache used for images converted to base64
+    and resets its hit/miss counters.
+    """  # NOQA E501
+    _CACHE.clear()
+
+
+def configure_cache(
+        enabled: bool = None,
+        max_bytes: int = None,
+        disk_dir: str = None):
+    """Configures the cache used for images converted to base64.
+    Params which are not provided keep their current values.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Turns the cache on or off.
+    max_bytes : int, optional
+        Max total size (in bytes) of the in-memory tier.
+        Least recently used entries are evicted once the limit is exceeded.
+    disk_dir : str, optional
+        Directory for the on-disk tier.
+        Use empty string to disable the on-disk tier.
+    """
+    if enabled is not None:
+        _CACHE.enabled = enabled
+    if disk_dir is not None:
+        _CACHE.disk_dir = disk_dir or None
+    if max_bytes is not None:
+        _CACHE.set_max_bytes(max_bytes)
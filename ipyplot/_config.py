@@ -0,0 +1,56 @@
+"""
+Global options for IPyPlot package.
+"""
+
+_OPTIONS = {
+    # whether "show html" viewer is displayed above each plot
+    'html_viewer': True,
+    # settings for downloading remote images embedded with `force_b64=True`
+    'fetch_max_workers': 8,
+    'fetch_timeout': 10.0,
+    'fetch_retries': 2,
+}
+
+
+def set_options(**options):
+    """Sets global IPyPlot options.
+
+    Parameters
+    ----------
+    html_viewer : bool, optional
+        Whether the "show html" viewer is displayed above each plot.
+        Base64 data of embedded images is truncated in the viewer so it doesn't duplicate the payload.
+        Defaults to True.
+    fetch_max_workers : int, optional
+        Max number of concurrent downloads of remote images embedded with `force_b64=True`.
+        Defaults to 8.
+    fetch_timeout : float, optional
+        Timeout (in seconds) for a single download attempt.
+        Defaults to 10.0.
+    fetch_retries : int, optional
+        How many times a failed download is retried (with exponential backoff).
+        Defaults to 2.
+
+    Example
+    -------
+    ```
+    ipyplot.set_options(html_viewer=False)
+    ```
+    """  # NOQA E501
+    unknown = set(options) - set(_OPTIONS)
+    if unknown:
+        raise ValueError(
+            'Unknown option(s): %s. Available options: %s' % (
+                ', '.join(sorted(unknown)), ', '.join(sorted(_OPTIONS))))
+    _OPTIONS.update(options)
+
+
+def get_options():
+    """Returns a copy of current global IPyPlot options.
+
+    Returns
+    -------
+    dict
+        Dictionary with option names and their values.
+    """
+    return dict(_OPTIONS)
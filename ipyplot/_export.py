@@ -0,0 +1,184 @@
+"""
+Functions for exporting plots as standalone HTML reports (e.g. for CI artifacts or dashboards)
+instead of displaying them in notebooks.
+"""  # NOQA E501
+
+import base64
+import hashlib
+import io
+import os
+import re
+from typing import Sequence
+
+from ._html_helpers import _capture_html
+from ._plotting import plot_class_tabs, plot_images
+
+_ASSET_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+_IMAGE_DATA_URI_PATTERN = re.compile(
+    r'data:(image/[\w+.-]+);base64,([A-Za-z0-9+/=]+)')
+
+_DOCUMENT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>%s</title>
+</head>
+<body>
+%s
+</body>
+</html>
+"""
+
+
+def _write_assets(
+        html: str,
+        assets_dir: str,
+        assets_url: str):
+    """Writes images embedded in `html` as data URIs to separate files and replaces data URIs with links to them.
+    Files are named after hashes of their content, so duplicated images are written only once
+    (also across reports sharing the same `assets_dir`).
+
+    Parameters
+    ----------
+    html : str
+        HTML code with embedded images.
+    assets_dir : str
+        Directory to write image files to.
+    assets_url : str
+        URL of `assets_dir` used in links (e.g. path relative to the HTML file).
+
+    Returns
+    -------
+    str
+        HTML code linking image files.
+    """  # NOQA E501
+    os.makedirs(assets_dir, exist_ok=True)
+    written = set()
+
+    def write_asset(match):
+        mime, payload = match.groups()
+        data = base64.b64decode(payload)
+        name = hashlib.blake2b(data, digest_size=16).hexdigest() + \
+            _ASSET_EXTENSIONS.get(mime, '')
+        if name not in written:
+            path = os.path.join(assets_dir, name)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+            written.add(name)
+        return assets_url.rstrip('/') + '/' + name
+
+    return _IMAGE_DATA_URI_PATTERN.sub(write_asset, html)
+
+
+def to_html(
+        images: Sequence[object],
+        labels: Sequence[str or int] = None,
+        tabs: bool = False,
+        assets_dir: str = None,
+        assets_url: str = None,
+        title: str = 'IPyPlot',
+        force_b64: bool = True,
+        **kwargs):
+    """
+    Creates standalone HTML document with images plotted the same way as with `plot_images` or `plot_class_tabs`,
+    without displaying anything (IPython frontend is not needed).
+
+    Parameters
+    ----------
+    images : Sequence[object]
+        List of images to be displayed.
+        Check `ipyplot.plot_images` for supported formats.
+    labels : Sequence[str or int], optional
+        List of classes/labels for images.
+        Required if `tabs` is `True`.
+        Defaults to None.
+    tabs : bool, optional
+        Whether images are displayed in tabs grouped by labels (`plot_class_tabs`)
+        or in a single grid (`plot_images`).
+        Defaults to False.
+    assets_dir : str, optional
+        If provided, images are written as separate files (named after hashes of their content, so duplicates are written once)
+        to this directory and linked from the document instead of being embedded as base64 data URIs.
+        This keeps reports with lots of images small and lets browsers load images incrementally.
+        Defaults to None.
+    assets_url : str, optional
+        URL of `assets_dir` used in the document, e.g. when the document is served from another location.
+        Defaults to None (`assets_dir` is used).
+    title : str, optional
+        Title of the document.
+        Defaults to `'IPyPlot'`.
+    force_b64 : bool, optional
+        Whether images from string URLs are embedded as well, which is required for the document to be standalone.
+        Files which don't need resizing are embedded as they are, so it's cheap.
+        Defaults to True.
+    **kwargs
+        Other params of `ipyplot.plot_images` (or `ipyplot.plot_class_tabs` if `tabs` is `True`),
+        e.g. `max_images`, `img_width`, `img_format` or `sample`.
+
+    Returns
+    -------
+    str
+        HTML document.
+    """  # NOQA E501
+    with _capture_html() as outputs:
+        if tabs:
+            plot_class_tabs(images, labels, force_b64=force_b64, **kwargs)
+        else:
+            # progressive display doesn't make sense for files
+            kwargs['progressive'] = False
+            plot_images(images, labels, force_b64=force_b64, **kwargs)
+    html = ''.join(outputs)
+
+    if assets_dir is not None:
+        html = _write_assets(
+            html, assets_dir,
+            assets_url or assets_dir.replace(os.sep, '/'))
+    return _DOCUMENT_TEMPLATE % (title, html)
+
+
+def save_html(
+        path: str or io.TextIOBase,
+        images: Sequence[object],
+        labels: Sequence[str or int] = None,
+        tabs: bool = False,
+        assets_dir: str = None,
+        title: str = 'IPyPlot',
+        force_b64: bool = True,
+        **kwargs):
+    """
+    Saves images plotted the same way as with `plot_images` or `plot_class_tabs` to a standalone HTML file.
+    Check `ipyplot.to_html` for description of params.
+
+    Parameters
+    ----------
+    path : str or file object
+        Output HTML file path or text stream to write to.
+    assets_dir : str, optional
+        If provided, images are written as separate files to this directory instead of being embedded as base64 data URIs.
+        Relative path is resolved against the directory of `path` (or current working directory for streams),
+        e.g. `save_html('out/report.html', ..., assets_dir='assets')` writes images to `out/assets`.
+        Defaults to None.
+    """  # NOQA E501
+    is_stream = hasattr(path, 'write')
+    html_dir = os.getcwd() if is_stream \
+        else os.path.dirname(os.path.abspath(path))
+    assets_url = None
+    if assets_dir is not None:
+        assets_dir = os.path.join(html_dir, assets_dir)
+        assets_url = os.path.relpath(assets_dir, html_dir).replace(os.sep, '/')
+
+    html = to_html(
+        images, labels, tabs=tabs, assets_dir=assets_dir,
+        assets_url=assets_url, title=title, force_b64=force_b64, **kwargs)
+    if is_stream:
+        path.write(html)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
@@ -0,0 +1,207 @@
+"""
+Helper methods for downloading remote images (e.g. to embed them as base64 with `force_b64=True`).
+Downloads run concurrently in a bounded thread pool, with timeouts and retries,
+over a pool of keep-alive connections, and downloaded files are kept in the shared cache
+so they are not downloaded again.
+"""  # NOQA E501
+
+import base64
+import http.client
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+from ._cache import _CACHE, _cache_key
+from ._config import _OPTIONS
+from ._profiling import _profiled
+
+# HTTP status codes worth retrying (timeouts, rate limiting, server errors)
+_RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+_REDIRECT_STATUS_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+# idle keep-alive connections by (scheme, host), reused by subsequent downloads
+_CONNECTIONS = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+
+def _get_connection(scheme: str, netloc: str):
+    """Returns idle pooled connection to `netloc` (or None if there is none)."""  # NOQA E501
+    with _CONNECTIONS_LOCK:
+        pool = _CONNECTIONS.get((scheme, netloc))
+        return pool.pop() if pool else None
+
+
+def _release_connection(scheme: str, netloc: str, conn):
+    """Puts connection back to the pool (at most `fetch_max_workers` idle connections per host are kept)."""  # NOQA E501
+    with _CONNECTIONS_LOCK:
+        pool = _CONNECTIONS.setdefault((scheme, netloc), [])
+        if len(pool) < _OPTIONS['fetch_max_workers']:
+            pool.append(conn)
+            return
+    conn.close()
+
+
+def _send(scheme: str, netloc: str, path: str, timeout: float):
+    """Sends GET request over pooled keep-alive connection.
+    Pooled connection might have been closed by the server in the meantime,
+    in which case the request is sent once again over a new connection.
+
+    Returns
+    -------
+    (http.client.HTTPResponse, bytes)
+        Response along with its content.
+    """
+    conn = _get_connection(scheme, netloc)
+    reused = conn is not None
+    while True:
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if scheme == 'https' \
+                else http.client.HTTPConnection
+            conn = conn_class(netloc, timeout=timeout)
+        try:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.request('GET', path, headers={'User-Agent': 'IPyPlot'})
+            response = conn.getresponse()
+            data = response.read()
+            break
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            conn, reused = None, False
+
+    if response.will_close:
+        conn.close()
+    else:
+        _release_connection(scheme, netloc, conn)
+    return response, data
+
+
+def _get(url: str, timeout: float):
+    """Downloads content of `url` (following redirects) over pooled connections.
+
+    Returns
+    -------
+    bytes
+        Content of the response.
+    """
+    for _ in range(_MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        response, data = _send(parts.scheme, parts.netloc, path, timeout)
+
+        location = response.getheader('Location')
+        if response.status in _REDIRECT_STATUS_CODES and location:
+            url = urllib.parse.urljoin(url, location)
+            continue
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None)
+        return data
+    raise urllib.error.URLError('Too many redirects: %s' % url)
+
+
+def _fetch_url(
+        url: str,
+        timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5):
+    """Downloads file from `url`, retrying transient failures with exponential backoff.
+    Downloaded files are cached (see `ipyplot.cache_info`).
+
+    Parameters
+    ----------
+    url : str
+        Remote URL of the file.
+    timeout : float, optional
+        Timeout (in seconds) for each attempt.
+        Defaults to 10.0.
+    retries : int, optional
+        How many times failed download is retried.
+        Defaults to 2.
+    backoff : float, optional
+        Delay (in seconds) before the first retry, doubled after each attempt.
+        Defaults to 0.5.
+
+    Returns
+    -------
+    bytes
+        Content of the file.
+    """  # NOQA E501
+    key = _cache_key(url, 'fetch')
+    cached = _CACHE.get(key)
+    if cached is not None:
+        return base64.b64decode(cached)
+
+    # proxies configured in environment are handled by urllib
+    # (without pooled connections)
+    parts = urllib.parse.urlsplit(url)
+    use_proxy = parts.scheme in urllib.request.getproxies() \
+        and not urllib.request.proxy_bypass(parts.hostname)
+    request = urllib.request.Request(
+        url, headers={'User-Agent': 'IPyPlot'})
+    for attempt in range(retries + 1):
+        try:
+            if use_proxy:
+                with urllib.request.urlopen(request, timeout=timeout) as response:  # NOQA E501
+                    data = response.read()
+            else:
+                data = _get(url, timeout)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code not in _RETRY_STATUS_CODES or attempt == retries:
+                raise
+        except (http.client.HTTPException, OSError):
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+    _CACHE.put(key, base64.b64encode(data).decode('utf-8'))
+    return data
+
+
+def _try_fetch_url(url: str, **kwargs):
+    """Same as `_fetch_url` but returns None (and prints a warning) instead of raising."""  # NOQA E501
+    try:
+        return _fetch_url(url, **kwargs)
+    except Exception as e:
+        print("WARNING: Couldn't download '%s' (%s). Image will be displayed from its URL." % (url, e))  # NOQA E501
+        return None
+
+
+@_profiled('fetch')
+def _fetch_urls(urls: Sequence[str]):
+    """Downloads files from `urls` concurrently.
+    Number of concurrent downloads, timeout and number of retries
+    are set with `ipyplot.set_options`.
+
+    Parameters
+    ----------
+    urls : Sequence[str]
+        List of remote URLs.
+
+    Returns
+    -------
+    list
+        List of the same length as `urls` with downloaded content (bytes)
+        or None for files which couldn't be downloaded.
+    """
+    if len(urls) == 0:
+        return []
+    kwargs = {
+        'timeout': _OPTIONS['fetch_timeout'],
+        'retries': _OPTIONS['fetch_retries'],
+    }
+    max_workers = max(1, min(_OPTIONS['fetch_max_workers'], len(urls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda url: _try_fetch_url(url, **kwargs), urls))
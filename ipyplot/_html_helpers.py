@@ -3,21 +3,35 @@ This module contains helper functions for generating HTML code
 required for displaying images, grid/tab layout and general styling.
 """
 
-from typing import Sequence
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Iterator, Sequence
 
+import itertools
 import os
+import re
 import numpy as np
 import shortuuid
 from numpy import str_
 
-from ._img_helpers import _img_to_base64
+from ._atlas import _create_atlases
+from ._config import _OPTIONS
+from ._img_helpers import (
+    _encode_images, _get_img_size, _img_to_data_uri, _needs_b64,
+    _scale_wh_by_target_width)
+from ._profiling import _profiled, _record_output
+from ._utils import (
+    _get_executor, _group_indices_by_label, _is_remote_url, _take)
 
-try:
-    from IPython.display import display, HTML
-except Exception:  # pragma: no cover
-    raise Exception('IPython not detected. Plotting without IPython is not possible')  # NOQA E501
 
+# transparent 1x1 GIF displayed in place of images which are not converted yet
+_PLACEHOLDER_SRC = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'  # NOQA E501
 
+# inline handler moving lazy tab content out of its template
+_LAZY_TAB_ONCHANGE = ' onchange="var t = document.getElementById(\'ipyplot-tab-template-%s\'); if (t) { t.parentNode.appendChild(t.content.cloneNode(true)); t.remove(); }"'  # NOQA E501
+
+
+@_profiled('html')
 def _create_tabs(
         images: Sequence[object],
         labels: Sequence[str or int],
@@ -28,7 +42,16 @@ def _create_tabs(
         show_url: bool = True,
         force_b64: bool = False,
         tabs_order: Sequence[str or int] = None,
-        resize_image: bool = False):
+        resize_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        lazy_tabs: bool = False,
+        lazy_loading: bool = True,
+        layout: str = 'grid',
+        sample: str = 'first',
+        seed: int = None):
     """
     Generates HTML code required to display images in interactive tabs grouped by labels.
     For tabs ordering and filtering check out `tabs_order` param.
@@ -41,8 +64,9 @@ def _create_tabs(
         - str (local/remote URL)
         - PIL.Image
         - numpy.ndarray
-    labels : Sequence[str or int]
-        List of classes/labels for images to be grouped by.
+        Only images which end up displayed are accessed, so it can be any lazily indexable dataset or an iterator.
+    labels : numpy.ndarray
+        Array of classes/labels for images to be grouped by.
         Must be same length as `images`.
     custom_texts : Sequence[str], optional
         List of custom strings to be drawn above each image.
@@ -68,94 +92,178 @@ def _create_tabs(
         By default, tabs will be sorted alphabetically based on provided labels.
         This param can be also used as a filtering mechanism - only labels provided in `tabs_order` param will be displayed as tabs.
         Defaults to None.
-    resize_image : bool, optional
-        If `True` it will resize image based on `width` parameter.
+    resize_width : int, optional
+        Target width (in pixels) to downscale images converted to base64 to.
         Useful when working with big images and notebooks getting too big in terms of file size.
+        Images narrower than `resize_width` are kept as they are.
+        Defaults to None (no resizing).
+    img_format : str, optional
+        Output format for images converted to base64, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (files which don't need downscaling are embedded as they are, other images are encoded as PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images (from all tabs) to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1 - either `'thread'` or `'process'`.
+        Custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    lazy_tabs : bool, optional
+        If `True` only the content of the first tab is rendered upfront.
+        Content of other tabs is kept in inert `<template>` blocks and rendered by the browser when tab is opened for the first time.
+        Requires JavaScript to be enabled for the output (e.g. trusted notebook).
         Defaults to `False`.
+    lazy_loading : bool, optional
+        Adds `loading="lazy"` and `decoding="async"` attributes to `img` tags
+        so off-screen images are not fetched until scrolled into view.
+        Defaults to `True`.
+    layout : str, optional
+        Either `'grid'` (each image embedded separately) or `'atlas'`
+        (thumbnails of all images in a tab composed into one or a few tiled images).
+        Defaults to `'grid'`.
+    sample : str, optional
+        Which images are displayed in tabs with more than `max_imgs_per_tab` images,
+        either `'first'` ones or `'random'` ones (`'stratified'` is the same as `'random'` within a single tab).
+        Defaults to `'first'`.
+    seed : int, optional
+        Seed for random sampling.
+        Defaults to None.
     """  # NOQA E501
 
-    tab_layout_id = shortuuid.uuid()
+    # all element ids within the output share a single random prefix
+    html_ids = _get_html_ids()
+    tab_layout_id = next(html_ids)
 
-    # if `tabs_order` is None use sorted unique values from `labels`
-    if tabs_order is None:
-        tabs_order = np.unique(labels)
+    # group positions of images by labels in a single pass
+    # if `tabs_order` is None sorted unique values from `labels` are used
+    tabs_order, tabs_indices = _group_indices_by_label(
+        labels, tabs_order, max_imgs_per_tab, sample, seed)
 
     # assure same length for images, labels and custom_texts sequences
-    assert(len(labels) == len(images))
-    if custom_texts is not None:
-        assert(len(custom_texts) == len(images))
-
-    html = '<div>'
-    tab_ids = [shortuuid.uuid() for label in tabs_order]
-    style_html = """
-        <style>
-            input.ipyplot-tab-%(0)s {
-                display: none;
-            }
-            input.ipyplot-tab-%(0)s + label.ipyplot-tab-label-%(0)s {
-                border: 1px solid #999;
-                background: #EEE;
-                padding: 4px 12px;
-                border-radius: 4px 4px 0 0;
-                position: relative;
-                top: 1px;
-            }
-            input.ipyplot-tab-%(0)s:checked + label.ipyplot-tab-label-%(0)s {
-                background: #FFF;
-                border-bottom: 1px solid transparent;
-            }
-            input.ipyplot-tab-%(0)s ~ .tab {
-                border-top: 1px solid #999;
-                padding: 12px;
-            }
-
-            input.ipyplot-tab-%(0)s ~ .tab {
-                display: none
-            }
-    """ % {'0': tab_layout_id}
-
-    for i in tab_ids:
-        style_html += '#tab%s:checked ~ .tab.content%s,' % (i, i)
-    style_html = style_html[:-1] + '{ display: block; }</style>'
-
-    html += style_html
+    if hasattr(images, '__len__'):
+        assert(len(labels) == len(images))
+    if custom_texts is not None and hasattr(custom_texts, '__len__'):
+        assert(len(custom_texts) == len(labels))
+
+    # static style is shared by all tabs and grids within them
+    html = ['<div>', _get_default_style()]
+    tab_ids = [next(html_ids) for label in tabs_order]
+
+    # only rules connecting tab buttons with their content are tab specific
+    html.append('<style>%s{ display: block; }</style>' % ','.join(
+        '#tab%s:checked ~ .tab.content%s' % (i, i) for i in tab_ids))
 
     # sets the first tab to active/selected state
     active_tab = True
     for i, label in zip(tab_ids, tabs_order):
         # define radio type tab buttons for each label
-        html += '<input class="ipyplot-tab-%s" type="radio" name="tabs-%s" id="tab%s"%s/>' % (tab_layout_id, tab_layout_id, i, ' checked ' if active_tab else '')  # NOQA E501
-        html += '<label class="ipyplot-tab-label-%s" for="tab%s">%s</label>' % (tab_layout_id, i, label)  # NOQA E501
+        # with lazy tabs content is instantiated from template on first open
+        onchange = _LAZY_TAB_ONCHANGE % i if lazy_tabs and not active_tab else ''  # NOQA E501
+        html.append('<input class="ipyplot-tab" type="radio" name="tabs-%s" id="tab%s"%s%s/>' % (tab_layout_id, i, ' checked ' if active_tab else '', onchange))  # NOQA E501
+        html.append('<label class="ipyplot-tab-label" for="tab%s">%s</label>' % (i, label))  # NOQA E501
         active_tab = False
 
+    # select images for each tab upfront so that images from all tabs
+    # can be converted to base64 in a single (parallel) pass
+    # only selected images are accessed, the rest is never touched
+    all_indices = np.concatenate(tabs_indices + [np.zeros(0, dtype=int)])
+    all_images = _take(images, all_indices)
+    all_texts = _take(custom_texts, all_indices) \
+        if custom_texts is not None else None
+
+    tabs_images = []
+    tabs_texts = []
+    offset = 0
+    for tab_indices in tabs_indices:
+        end = offset + len(tab_indices)
+        tabs_images.append(all_images[offset:end])
+        tabs_texts.append(
+            all_texts[offset:end] if all_texts is not None else None)
+        offset = end
+
+    if layout == 'atlas':
+        # images are composed into atlases separately for each tab
+        srcs = [None] * len(all_images)
+    else:
+        srcs = _encode_images(
+            all_images,
+            force_b64=force_b64,
+            target_width=resize_width,
+            img_format=img_format,
+            quality=quality,
+            n_jobs=n_jobs,
+            parallel_backend=parallel_backend)
+
     # sets the first tab to active/selected state
     active_tab = True
-    for i, label in zip(tab_ids, tabs_order):
+    offset = 0
+    for i, tab_images, tab_texts in zip(tab_ids, tabs_images, tabs_texts):
         # define content for each tab
-        html += '<div class="tab content%s">' % i  # NOQA E501
-        active_tab = False
+        html.append('<div class="tab content%s">' % i)
 
-        tab_imgs_mask = labels == label
-        html += _create_imgs_grid(
-            images=images[tab_imgs_mask],
+        grid_html = _create_imgs_grid(
+            images=tab_images,
             labels=list(range(0, max_imgs_per_tab)),
             max_images=max_imgs_per_tab,
             img_width=img_width,
             zoom_scale=zoom_scale,
-            custom_texts=custom_texts[tab_imgs_mask] if custom_texts is not None else None,  # NOQA E501
+            custom_texts=tab_texts,
             show_url=show_url,
-            force_b64=force_b64)
+            force_b64=force_b64,
+            resize_width=resize_width,
+            img_format=img_format,
+            quality=quality,
+            n_jobs=n_jobs,
+            parallel_backend=parallel_backend,
+            img_srcs=srcs[offset:offset + len(tab_images)],
+            lazy_loading=lazy_loading,
+            layout=layout,
+            include_style=False,
+            html_ids=html_ids)
+        offset += len(tab_images)
+
+        if lazy_tabs and not active_tab:
+            # template content is parsed but not rendered
+            # and its images are not decoded/fetched until instantiated
+            html.append('<template id="ipyplot-tab-template-%s">%s</template>' % (i, grid_html))  # NOQA E501
+        else:
+            html.append(grid_html)
+        active_tab = False
+
+        html.append('</div>')
 
-        html += '</div>'
+    html.append('</div>')
 
-    html += '</div>'
+    return ''.join(html)
 
-    return html
 
+_DATA_URI_PATTERN = re.compile(r'(data:[\w/+.-]+;base64,)[A-Za-z0-9+/=]+')
+
+
+def _truncate_data_uris(html: str):
+    """Replaces base64 payload of all data URIs in `html` with `...`.
+
+    Parameters
+    ----------
+    html : str
+        HTML code.
 
+    Returns
+    -------
+    str
+        HTML code with truncated data URIs.
+    """
+    return _DATA_URI_PATTERN.sub(r'\1...', html)
+
+
+@_profiled('html')
 def _create_html_viewer(
         html: str):
     """Creates HTML code for HTML previewer.
+    Base64 data URIs are truncated so the images payload is not embedded twice.
 
     Parameters
     ----------
@@ -168,6 +276,7 @@ def _create_html_viewer(
         HTML code for HTML previewer control.
     """
 
+    html = _truncate_data_uris(html)
     html_viewer_id = shortuuid.uuid()
     html_viewer = """
     <style>
@@ -222,8 +331,50 @@ def _create_html_viewer(
     return html_viewer
 
 
+def _ipython_display():
+    """Imports IPython display functions.
+    IPython is imported only when something is actually displayed,
+    so generating HTML code (e.g. `ipyplot.to_html`) works without it.
+
+    Returns
+    -------
+    (function, type)
+        Returns a tuple of `IPython.display.display` function and `IPython.display.HTML` class.
+    """  # NOQA E501
+    try:
+        from IPython.display import display, HTML
+    except Exception:
+        raise Exception('IPython not detected. Plotting without IPython is not possible')  # NOQA E501
+    return display, HTML
+
+
+# stack of lists collecting HTML code of plots instead of displaying it
+_CAPTURED = []
+
+
+@contextmanager
+def _capture_html():
+    """Context manager collecting HTML code of all plots created within it
+    (in the order they are created) instead of displaying them.
+
+    Yields
+    ------
+    list
+        List which gets HTML code of each plot appended.
+    """
+    outputs = []
+    _CAPTURED.append(outputs)
+    try:
+        yield outputs
+    finally:
+        _CAPTURED.remove(outputs)
+
+
+@_profiled('display')
 def _display_html(html: str):
     """Simply displays provided HTML string using IPython.display function.
+    "show html" viewer is displayed first unless disabled with `ipyplot.set_options(html_viewer=False)`.
+    Within `_capture_html` context HTML is only collected.
 
     Parameters
     ----------
@@ -234,11 +385,187 @@ def _display_html(html: str):
     -------
     handle: DisplayHandle
         Returns a handle on updatable displays
-    """
-    display(HTML(_create_html_viewer(html)))
+    """  # NOQA E501
+    _record_output(html)
+    if _CAPTURED:
+        _CAPTURED[-1].append(html)
+        return None
+    display, HTML = _ipython_display()
+    if _OPTIONS['html_viewer']:
+        display(HTML(_create_html_viewer(html)))
     return display(HTML(html))
 
 
+def _get_html_ids(prefix: str = None):
+    """Creates generator of HTML element ids unique within a single output.
+    Random prefix is generated only once per call and ids are simply counted up,
+    which is much cheaper than generating UUID for every element.
+
+    Parameters
+    ----------
+    prefix : str, optional
+        Prefix for all ids, e.g. to keep ids stable when the same output is re-rendered.
+        Defaults to None (random prefix is generated).
+
+    Returns
+    -------
+    Iterator[str]
+        Infinite generator of ids in `<prefix>-<counter>` format.
+    """  # NOQA E501
+    prefix = prefix or shortuuid.uuid()
+    return ('%s-%d' % (prefix, i) for i in itertools.count())
+
+
+# templates used for every single image are defined once on module level
+_TEXT_TEMPLATE = '<h4 style="font-size: 12px; word-wrap: break-word;">%s</h4>'
+_URL_TEMPLATE = '<h4 style="font-size: 9px; padding-left: 10px; padding-right: 10px; width: 95%%; word-wrap: break-word; white-space: normal;">%s</h4>'  # NOQA E501
+_IMG_TAG_TEMPLATE = '<img src="%s"%s/>'
+_IMG_TEMPLATE = """
+    <div class="ipyplot-placeholder-div">
+        <div id="ipyplot-content-div-%s-%s" class="ipyplot-content-div">
+            <h4 style="font-size: 12px; word-wrap: break-word;">%s</h4>
+            %s
+            <a href="#!">
+                <span class="ipyplot-img-close"/>
+            </a>
+            <a href="#ipyplot-content-div-%s-%s">
+                <span class="ipyplot-img-expand"/>
+            </a>
+        </div>
+    </div>
+    """
+
+
+@_profiled('display')
+def _display_imgs_grid_progressive(
+        images: Sequence[object],
+        labels: Sequence[str or int],
+        custom_texts: Sequence[str] = None,
+        max_images: int = 30,
+        img_width: int = 150,
+        zoom_scale: float = 2.5,
+        show_url: bool = True,
+        force_b64: bool = False,
+        resize_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        lazy_loading: bool = True,
+        chunk_size: int = 8):
+    """Displays grid of images immediately (with placeholders in place of images which need base64 conversion)
+    and updates it in place as images are converted, chunk by chunk.
+    Chunks grow twice after each update so the total size of all updates stays below twice the size of the final output.
+    Check `_create_imgs_grid` for description of params.
+
+    Parameters
+    ----------
+    chunk_size : int, optional
+        Number of images converted before the first update.
+        Defaults to 8.
+
+    Returns
+    -------
+    handle: DisplayHandle
+        Returns a handle on updatable displays
+    """  # NOQA E501
+    images = images[:max_images]
+    srcs = [
+        _PLACEHOLDER_SRC if _needs_b64(image, force_b64) else None
+        for image in images]
+    # element ids are kept the same in all updates
+    html_ids_prefix = shortuuid.uuid()
+
+    def create_html():
+        return _create_imgs_grid(
+            images=images,
+            labels=labels,
+            custom_texts=custom_texts,
+            max_images=max_images,
+            img_width=img_width,
+            zoom_scale=zoom_scale,
+            show_url=show_url,
+            force_b64=force_b64,
+            resize_width=resize_width,
+            img_srcs=srcs,
+            lazy_loading=lazy_loading,
+            html_ids=_get_html_ids(html_ids_prefix))
+
+    display, HTML = _ipython_display()
+    viewer_handle = None
+    if _OPTIONS['html_viewer']:
+        viewer_handle = display(HTML(''), display_id=True)
+    html = create_html()
+    _record_output(html)
+    handle = display(HTML(html), display_id=True)
+
+    # single executor is reused for all chunks
+    with _get_executor(n_jobs, parallel_backend) as executor:
+        start = 0
+        while start < len(images):
+            end = min(len(images), start + chunk_size)
+            srcs[start:end] = _encode_images(
+                images[start:end],
+                force_b64=force_b64,
+                target_width=resize_width,
+                img_format=img_format,
+                quality=quality,
+                n_jobs=n_jobs,
+                parallel_backend=executor or parallel_backend)
+            if handle is not None:
+                html = create_html()
+                _record_output(html)
+                handle.update(HTML(html))
+            start = end
+            chunk_size *= 2
+
+    # outside of IPython kernel displays can't be updated
+    # so the final output is simply displayed once again
+    html = create_html()
+    if _OPTIONS['html_viewer']:
+        if viewer_handle is not None:
+            viewer_handle.update(HTML(_create_html_viewer(html)))
+        else:
+            display(HTML(_create_html_viewer(html)))
+    if handle is None:
+        _record_output(html)
+        handle = display(HTML(html))
+    return handle
+
+
+def _create_img_attrs(
+        image: str or object,
+        width: int,
+        lazy_loading: bool = True):
+    """Creates additional attributes for HTML `img` tag.
+    Explicit `width` and `height` are added when image dimensions are known
+    (e.g. for PIL.Image and numpy.ndarray) so layout doesn't reflow as images arrive.
+
+    Parameters
+    ----------
+    image : str or object
+        Image object or string URL to local/external image file.
+    width : int
+        Displayed image width value in pixels.
+    lazy_loading : bool, optional
+        Adds `loading="lazy"` and `decoding="async"` attributes.
+        Defaults to `True`.
+
+    Returns
+    -------
+    str
+        Attributes string (with leading space) or empty string.
+    """  # NOQA E501
+    attrs = ''
+    if lazy_loading:
+        attrs += ' loading="lazy" decoding="async"'
+        size = _get_img_size(image)
+        if size is not None and size[0] > 0:
+            attrs += ' width="%d" height="%d"' % _scale_wh_by_target_width(
+                size[0], size[1], width)
+    return attrs
+
+
 def _create_img(
         image: str or object,
         label: str or int,
@@ -247,7 +574,13 @@ def _create_img(
         custom_text: str = None,
         show_url: bool = True,
         force_b64: bool = False,
-        resize_image: bool = False):
+        resize_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        img_src: str = None,
+        lazy_loading: bool = True,
+        img_tag: str = None,
+        img_id: str or int = None):
     """Helper function to generate HTML code for displaying images along with corresponding texts.
 
     Parameters
@@ -259,7 +592,7 @@ def _create_img(
     width : int
         Image width value in pixels.
     grid_style_uuid : str
-        Unique identifier used to connect image style with specific style definition.
+        Unique identifier of the grid used to create unique image element ids.
     custom_text : str, optional
         Additional text to be displayed above the image but below the label name.
         Defaults to None.
@@ -270,10 +603,32 @@ def _create_img(
         Do mind that using b64 conversion vs reading directly from filepath will be slower.
         You might need to set this to `True` in environments like Google colab.
         Defaults to False.
-    resize_image : bool, optional
-        If `True` it will resize image based on `width` parameter.
+    resize_width : int, optional
+        Target width (in pixels) to downscale images converted to base64 to.
         Useful when working with big images and notebooks getting too big in terms of file size.
-        Defaults to `False`.
+        Images narrower than `resize_width` are kept as they are.
+        Defaults to None (no resizing).
+    img_format : str, optional
+        Output format for images converted to base64, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (files which don't need downscaling are embedded as they are, other images are encoded as PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    img_src : str, optional
+        Precomputed base64 data URI for the image.
+        If provided, it's used instead of converting the image on the fly.
+        Defaults to None.
+    lazy_loading : bool, optional
+        Adds `loading="lazy"` and `decoding="async"` attributes to the `img` tag
+        so off-screen images are not fetched until scrolled into view.
+        Defaults to `True`.
+    img_tag : str, optional
+        Precomputed HTML element displaying the image (e.g. atlas cell).
+        If provided, it's used instead of the `img` tag.
+        Defaults to None.
+    img_id : str or int, optional
+        Identifier of the image unique within the grid (e.g. its position).
+        Defaults to None (random identifier is generated).
 
     Returns
     -------
@@ -283,13 +638,16 @@ def _create_img(
     if width is None:
         raise ValueError("`img_width` can't be `None`!")
 
-    img_uuid = shortuuid.uuid()
+    if img_id is None:
+        img_id = shortuuid.uuid()
+
+    img_attrs = _create_img_attrs(image, width, lazy_loading)
 
     img_html = ""
     if custom_text is not None:
-        img_html += '<h4 style="font-size: 12px; word-wrap: break-word;">%s</h4>' % str(custom_text)  # NOQA E501
+        img_html += _TEXT_TEMPLATE % str(custom_text)
 
-    use_b64 = True
+    use_b64 = img_tag is None
 
     if type(image) is str or type(image) is str_:
         # if image url is local path convert to relative path
@@ -297,38 +655,29 @@ def _create_img(
         if not any(image.lower().startswith(x) for x in matches):
             image = os.path.relpath(image)
         if show_url:
-            img_html += '<h4 style="font-size: 9px; padding-left: 10px; padding-right: 10px; width: 95%%; word-wrap: break-word; white-space: normal;">%s</h4>' % (image)  # NOQA E501
-        if not force_b64:
-            use_b64 = False
-            img_html += '<img src="%s"/>' % image
-        elif "http" in image:
-            print("WARNING: Current implementation doesn't allow to use 'force_b64=True' with images as remote URLs. Ignoring 'force_b64' flag")  # NOQA E501
+            img_html += _URL_TEMPLATE % image
+        if img_tag is None and (
+                not force_b64 or (img_src is None and _is_remote_url(image))):
+            # remote images are downloaded and converted upfront (see `_encode_images`)
+            # so missing `img_src` means download failed and image is displayed from its URL
             use_b64 = False
+            img_html += _IMG_TAG_TEMPLATE % (image, img_attrs)
 
     # if image is not a string it means its either PIL.Image or np.ndarray
     # that's why it's necessary to use conversion to b64
-    if use_b64:
-        img_html += '<img src="data:image/png;base64,%s"/>' % _img_to_base64(
-            image,
-            width if resize_image else None)
-
-    html = """
-    <div class="ipyplot-placeholder-div-%(0)s">
-        <div id="ipyplot-content-div-%(0)s-%(1)s" class="ipyplot-content-div-%(0)s">
-            <h4 style="font-size: 12px; word-wrap: break-word;">%(2)s</h4>
-            %(3)s
-            <a href="#!">
-                <span class="ipyplot-img-close"/>
-            </a>
-            <a href="#ipyplot-content-div-%(0)s-%(1)s">
-                <span class="ipyplot-img-expand"/>
-            </a>
-        </div>
-    </div>
-    """ % {'0': grid_style_uuid, '1': img_uuid, '2': label, '3': img_html}  # NOQA E501
-    return html
+    if img_tag is not None:
+        img_html += img_tag
+    elif use_b64:
+        if img_src is None:
+            img_src = _img_to_data_uri(
+                image, resize_width, img_format, quality)
+        img_html += _IMG_TAG_TEMPLATE % (img_src, img_attrs)
 
+    return _IMG_TEMPLATE % (
+        grid_style_uuid, img_id, label, img_html, grid_style_uuid, img_id)
 
+
+@_profiled('html')
 def _create_imgs_grid(
         images: Sequence[object],
         labels: Sequence[str or int],
@@ -338,7 +687,16 @@ def _create_imgs_grid(
         zoom_scale: float = 2.5,
         show_url: bool = True,
         force_b64: bool = False,
-        resize_image: bool = False):
+        resize_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        img_srcs: Sequence[str] = None,
+        lazy_loading: bool = True,
+        layout: str = 'grid',
+        include_style: bool = True,
+        html_ids: Iterator[str] = None):
     """
     Creates HTML code for displaying images provided in `images` param in grid-like layout.
     Check optional params for max number of images to plot, labels and custom texts to add to each image, image width and other options.
@@ -373,10 +731,46 @@ def _create_imgs_grid(
         Do mind that using b64 conversion vs reading directly from filepath will be slower.
         You might need to set this to `True` in environments like Google colab.
         Defaults to False.
-    resize_image : bool, optional
-        If `True` it will resize image based on `width` parameter.
+    resize_width : int, optional
+        Target width (in pixels) to downscale images converted to base64 to.
         Useful when working with big images and notebooks getting too big in terms of file size.
-        Defaults to `False`.
+        Images narrower than `resize_width` are kept as they are.
+        Defaults to None (no resizing).
+    img_format : str, optional
+        Output format for images converted to base64, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (files which don't need downscaling are embedded as they are, other images are encoded as PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1 - either `'thread'` or `'process'`.
+        Custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    img_srcs : Sequence[str], optional
+        Precomputed base64 data URIs for the first `max_images` images
+        (`None` for images displayed directly from their URLs).
+        If not provided, images are converted here.
+        Defaults to None.
+    lazy_loading : bool, optional
+        Adds `loading="lazy"` and `decoding="async"` attributes to `img` tags
+        so off-screen images are not fetched until scrolled into view.
+        Defaults to `True`.
+    layout : str, optional
+        Either `'grid'` (each image embedded separately) or `'atlas'`
+        (thumbnails of all images composed into one or a few tiled images).
+        Remote URLs are always embedded separately.
+        Defaults to `'grid'`.
+    include_style : bool, optional
+        Whether to include default (static) style definitions.
+        Set to `False` if style is already emitted once for the whole output (e.g. by `_create_tabs`).
+        Defaults to `True`.
+    html_ids : Iterator[str], optional
+        Generator of HTML element ids shared by the whole output (check `_get_html_ids`).
+        Defaults to None (new generator is created).
 
     Returns
     -------
@@ -384,31 +778,153 @@ def _create_imgs_grid(
         Output HTML code.
     """  # NOQA E501
 
+    if layout not in ('grid', 'atlas'):
+        raise ValueError("`layout` must be either 'grid' or 'atlas'")
+
     if custom_texts is None:
         custom_texts = [None for _ in range(len(images))]
 
-    # create code with style definitions
-    html, grid_style_uuid = _get_default_style(img_width, zoom_scale)
+    if html_ids is None:
+        html_ids = _get_html_ids()
+    grid_style_uuid = next(html_ids)
+
+    images = images[:max_images]
+    img_tags = [None] * len(images)
+    atlas_html = ''
+    if layout == 'atlas':
+        atlas_html, img_tags = _create_atlas_cells(
+            images, img_width, resize_width, img_format, quality,
+            n_jobs, parallel_backend, atlas_id=grid_style_uuid,
+            force_b64=force_b64)
+        if img_srcs is None:
+            img_srcs = [None] * len(images)
+    elif img_srcs is None:
+        img_srcs = _encode_images(
+            images,
+            force_b64=force_b64,
+            target_width=resize_width,
+            img_format=img_format,
+            quality=quality,
+            n_jobs=n_jobs,
+            parallel_backend=parallel_backend)
 
-    html += '<div id="ipyplot-imgs-container-div-%s">' % grid_style_uuid
-    html += ''.join([
+    # create code with style definitions
+    # only grid specific params are set on the container
+    html = [_get_default_style() if include_style else '', atlas_html]
+    html.append('<div id="ipyplot-imgs-container-div-%s" class="ipyplot-imgs-container-div" style="%s">' % (grid_style_uuid, _get_style_vars(img_width, zoom_scale)))  # NOQA E501
+    html.extend(
         _create_img(
             x, width=img_width, label=y,
             grid_style_uuid=grid_style_uuid,
             custom_text=text, show_url=show_url,
             force_b64=force_b64,
-            resize_image=resize_image
+            resize_width=resize_width,
+            img_format=img_format,
+            quality=quality,
+            img_src=src,
+            lazy_loading=lazy_loading,
+            img_tag=tag,
+            img_id=i
         )
-        for x, y, text in zip(
-            images[:max_images], labels[:max_images],
-            custom_texts[:max_images])
-    ])
-    html += '</div>'
-    return html
+        for i, (x, y, text, src, tag) in enumerate(zip(
+            images, labels[:max_images],
+            custom_texts[:max_images], img_srcs, img_tags))
+    )
+    html.append('</div>')
+    return ''.join(html)
+
+
+@_profiled('html')
+def _create_atlas_cells(
+        images: Sequence[object],
+        img_width: int,
+        resize_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        atlas_id: str = None,
+        force_b64: bool = False):
+    """Composes images into atlases and creates HTML code for CSS-positioned cells displaying them.
+
+    Parameters
+    ----------
+    images : Sequence[object]
+        List of images to be composed. Remote URLs are skipped unless `force_b64` is `True`.
+    img_width : int
+        Displayed image width in pixels.
+    resize_width : int, optional
+        Max width (in pixels) of thumbnails in the atlas, e.g. bigger than `img_width` to keep zoomed-in images sharp.
+        Smaller images are not upscaled, they are stretched to `img_width` by the browser.
+        Defaults to None (`img_width` is used).
+    img_format : str, optional
+        Output format for atlases, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    n_jobs : int, optional
+        Number of parallel workers used for creating thumbnails.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Either `'thread'`, `'process'` or a custom executor instance.
+        Defaults to `'thread'`.
+    atlas_id : str, optional
+        Identifier used in CSS class names of atlases.
+        Defaults to None (random identifier is generated).
+    force_b64 : bool, optional
+        Whether remote URLs should be downloaded and composed as well.
+        Defaults to False.
+
+    Returns
+    -------
+    (str, list)
+        Returns a tuple with HTML code defining atlases (embedded once)
+        and a list of HTML cells for each image (None for images which were not composed).
+    """  # NOQA E501
+    thumb_width = max(img_width, resize_width or 0)
+    atlases, cells = _create_atlases(
+        images, thumb_width, img_format, quality, n_jobs, parallel_backend,
+        force_b64=force_b64)
+    atlas_uuid = atlas_id or shortuuid.uuid()
+    atlas_html = '<style>'
+    for i, (uri, _) in enumerate(atlases):
+        atlas_html += 'div.ipyplot-atlas-%s-%d { background-image: url("%s"); }' % (atlas_uuid, i, uri)  # NOQA E501
+    atlas_html += '</style>'
+
+    img_tags = []
+    for cell in cells:
+        if cell is None:
+            img_tags.append(None)
+            continue
+        atlas_idx, x, y, w, h = cell
+        atlas_w, atlas_h = atlases[atlas_idx][1]
+        # atlas pixels per displayed pixel, thumbnails of small images
+        # keep their original width so each cell has its own scale
+        scale = w / img_width
+        img_tags.append(
+            '<div class="ipyplot-atlas-cell ipyplot-atlas-%s-%d" style="width: %gpx; height: %gpx; background-position: -%gpx -%gpx; background-size: %gpx %gpx;"></div>' % (  # NOQA E501
+                atlas_uuid, atlas_idx, w / scale, h / scale,
+                x / scale, y / scale, atlas_w / scale, atlas_h / scale))
+    return atlas_html, img_tags
+
 
+def _get_default_style():
+    """Creates HTML code with default style definitions required for elements to be properly displayed.
+    Style is static (the same for every plot), variable parts like image width and zoom scale
+    are provided through CSS custom properties set on each container (check `_get_style_vars`),
+    so it has to be emitted only once per output no matter how many grids/tabs it contains.
+
+    Returns
+    -------
+    str
+        Output HTML code.
+    """  # NOQA E501
+    return _DEFAULT_STYLE
 
-def _get_default_style(img_width: int, zoom_scale: float):
-    """Creates HTML code with default style definitions required for elements to be properly displayed
+
+def _get_style_vars(img_width: int, zoom_scale: float):
+    """Creates inline style with CSS custom properties used by default style definitions.
 
     Parameters
     ----------
@@ -421,78 +937,110 @@ def _get_default_style(img_width: int, zoom_scale: float):
     Returns
     -------
     str
-        Output HTML code.
-    """  # NOQA E501
-    style_uuid = shortuuid.uuid()
-    html = """
-        <style>
-        #ipyplot-imgs-container-div-%(0)s {
-            width: 100%%;
-            height: 100%%;
-            margin: 0%%;
-            overflow: auto;
-            position: relative;
-            overflow-y: scroll;
-        }
+        Value for HTML `style` attribute.
+    """
+    return '--ipyplot-img-width: %spx; --ipyplot-zoom-scale: %s;' % (
+        img_width, zoom_scale)
 
-        div.ipyplot-placeholder-div-%(0)s {
-            width: %(1)spx;
-            display: inline-block;
-            margin: 3px;
-            position: relative;
-        }
 
-        div.ipyplot-content-div-%(0)s {
-            width: %(1)spx;
-            background: white;
-            display: inline-block;
-            vertical-align: top;
-            text-align: center;
-            position: relative;
-            border: 2px solid #ddd;
-            top: 0;
-            left: 0;
-        }
+_DEFAULT_STYLE = """
+    <style>
+    div.ipyplot-imgs-container-div {
+        width: 100%;
+        height: 100%;
+        margin: 0%;
+        overflow: auto;
+        position: relative;
+        overflow-y: scroll;
+    }
 
-        div.ipyplot-content-div-%(0)s span.ipyplot-img-close {
-            display: none;
-        }
+    div.ipyplot-placeholder-div {
+        width: var(--ipyplot-img-width);
+        display: inline-block;
+        margin: 3px;
+        position: relative;
+    }
 
-        div.ipyplot-content-div-%(0)s span {
-            width: 100%%;
-            height: 100%%;
-            position: absolute;
-            top: 0;
-            left: 0;
-        }
+    div.ipyplot-content-div {
+        width: var(--ipyplot-img-width);
+        background: white;
+        display: inline-block;
+        vertical-align: top;
+        text-align: center;
+        position: relative;
+        border: 2px solid #ddd;
+        top: 0;
+        left: 0;
+    }
 
-        div.ipyplot-content-div-%(0)s img {
-            width: %(1)spx;
-        }
+    div.ipyplot-content-div span.ipyplot-img-close {
+        display: none;
+    }
 
-        div.ipyplot-content-div-%(0)s span.ipyplot-img-close:hover {
-            cursor: zoom-out;
-        }
-        div.ipyplot-content-div-%(0)s span.ipyplot-img-expand:hover {
-            cursor: zoom-in;
-        }
+    div.ipyplot-content-div span {
+        width: 100%;
+        height: 100%;
+        position: absolute;
+        top: 0;
+        left: 0;
+    }
 
-        div[id^=ipyplot-content-div-%(0)s]:target {
-            transform: scale(%(2)s);
-            transform-origin: left top;
-            z-index: 5000;
-            top: 0;
-            left: 0;
-            position: absolute;
-        }
+    div.ipyplot-content-div img {
+        width: var(--ipyplot-img-width);
+    }
 
-        div[id^=ipyplot-content-div-%(0)s]:target span.ipyplot-img-close {
-            display: block;
-        }
+    div.ipyplot-content-div div.ipyplot-atlas-cell {
+        display: inline-block;
+        vertical-align: top;
+        background-repeat: no-repeat;
+    }
 
-        div[id^=ipyplot-content-div-%(0)s]:target span.ipyplot-img-expand {
-            display: none;
-        }
-        </style>
-    """ % {'0': style_uuid, '1': img_width, '2': zoom_scale}
-    return html, style_uuid
+    div.ipyplot-content-div span.ipyplot-img-close:hover {
+        cursor: zoom-out;
+    }
+    div.ipyplot-content-div span.ipyplot-img-expand:hover {
+        cursor: zoom-in;
+    }
+
+    div.ipyplot-content-div:target {
+        transform: scale(var(--ipyplot-zoom-scale));
+        transform-origin: left top;
+        z-index: 5000;
+        top: 0;
+        left: 0;
+        position: absolute;
+    }
+
+    div.ipyplot-content-div:target span.ipyplot-img-close {
+        display: block;
+    }
+
+    div.ipyplot-content-div:target span.ipyplot-img-expand {
+        display: none;
+    }
+
+    input.ipyplot-tab {
+        display: none;
+    }
+    input.ipyplot-tab + label.ipyplot-tab-label {
+        border: 1px solid #999;
+        background: #EEE;
+        padding: 4px 12px;
+        border-radius: 4px 4px 0 0;
+        position: relative;
+        top: 1px;
+    }
+    input.ipyplot-tab:checked + label.ipyplot-tab-label {
+        background: #FFF;
+        border-bottom: 1px solid transparent;
+    }
+    input.ipyplot-tab ~ .tab {
+        border-top: 1px solid #999;
+        padding: 12px;
+    }
+
+    input.ipyplot-tab ~ .tab {
+        display: none
+    }
+    </style>
+"""
@@ -4,15 +4,253 @@ Helper methods for working with images.
 
 import base64
 import io
+import mmap
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Sequence
 
 import numpy as np
 from numpy import str_
 import PIL
-from PIL import Image
+
+from ._cache import _CACHE, _cache_key
+from ._fetch import _fetch_urls
+from ._profiling import _profiled, _record_images, _stage
+from ._utils import (
+    _get_executor, _is_pil_image, _is_remote_url, _parallel_map)
+
+
+def _to_channels_last(
+        image: np.ndarray,
+        batch: bool = False):
+    """Converts image array to (H, W) or (H, W, C) layout without copying data.
+    Channel-first (C, H, W) arrays with 1, 3 or 4 channels are transposed
+    and single channel (H, W, 1) arrays are squeezed.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Input image array.
+    batch : bool, optional
+        Whether `image` is a batch of images with leading N dimension.
+        Defaults to False.
+
+    Returns
+    -------
+    numpy.ndarray
+        View of the input array in channels-last layout.
+    """
+    offset = 1 if batch else 0
+    if image.ndim == 3 + offset:
+        first, last = image.shape[offset], image.shape[-1]
+        if first in (1, 3, 4) and last not in (1, 3, 4):
+            image = np.moveaxis(image, offset, -1)
+        if image.shape[-1] == 1:
+            image = image[..., 0]
+    return image
+
+
+def _normalize_to_uint8(
+        image: np.ndarray,
+        vmin: float = None,
+        vmax: float = None,
+        percentiles: (float, float) = None,
+        batch: bool = False):
+    """Converts image array of any numeric/bool dtype and layout to uint8 array
+    in (H, W) or (H, W, C) layout which can be used with `PIL.Image.fromarray`.
+
+    Values are scaled linearly from [vmin, vmax] range to [0, 255] and clipped.
+    If range is not provided it depends on dtype:
+    - uint8 - kept as it is
+    - bool - [0, 1]
+    - float - [0, 1] if max value is <= 1.0, [0, 255] otherwise
+    - uint16 - [0, 65535]
+    - other integers - [0, 255]
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        Input image array (or batch of images if `batch=True`).
+    vmin : float, optional
+        Value mapped to 0.
+        Defaults to None.
+    vmax : float, optional
+        Value mapped to 255.
+        Defaults to None.
+    percentiles : (float, float), optional
+        Lower and upper percentiles (0-100) used as `vmin` and `vmax`, e.g. (1, 99) to clip outliers.
+        Computed over the whole input array.
+        Defaults to None.
+    batch : bool, optional
+        Whether `image` is a batch of images with leading N dimension.
+        Defaults to False.
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 image array (or batch of arrays).
+    """  # NOQA E501
+    image = _to_channels_last(image, batch)
+
+    if percentiles is not None:
+        vmin, vmax = np.percentile(image, percentiles)
+
+    if vmin is None and vmax is None:
+        # fast paths for common dtypes
+        if image.dtype == np.uint8:
+            return image
+        if image.dtype == np.bool_:
+            return np.multiply(image, 255, dtype=np.uint8)
+        if image.dtype == np.uint16:
+            return np.right_shift(image, 8).astype(np.uint8)
+        if np.issubdtype(image.dtype, np.integer):
+            out = np.clip(image, 0, 255)
+            return out.astype(np.uint8, copy=False)
+
+    if vmin is None:
+        vmin = 0
+    if vmax is None:
+        if np.issubdtype(image.dtype, np.floating):
+            # if dtype is float and values range is from 0.0 to 1.0
+            # we need to normalize it to 0-255 range
+            vmax = 1.0 if image.max() <= 1.0 else 255.0
+        elif image.dtype == np.uint16:
+            vmax = 65535
+        else:
+            vmax = 1 if image.dtype == np.bool_ else 255
+
+    # single float32 buffer reused by all in-place operations
+    out = np.empty(image.shape, dtype=np.float32)
+    if vmin:
+        np.subtract(image, vmin, out=out, casting='unsafe')
+        np.multiply(out, 255.0 / max(vmax - vmin, 1e-12), out=out)
+    else:
+        np.multiply(image, 255.0 / max(vmax, 1e-12), out=out,
+                    casting='unsafe')
+    np.clip(out, 0, 255, out=out)
+    return out.astype(np.uint8)
+
+
+def normalize_images(
+        images: np.ndarray,
+        vmin: float = None,
+        vmax: float = None,
+        percentiles: (float, float) = None):
+    """Converts a batch of images, e.g. model outputs, to uint8 arrays ready for plotting in one vectorized pass.
+    Supports bool, float and any integer dtypes, (N, H, W), (N, H, W, 1), (N, H, W, C) and channel-first (N, C, H, W) layouts.
+    Values are scaled linearly from [vmin, vmax] range to [0, 255] and clipped.
+
+    Parameters
+    ----------
+    images : numpy.ndarray
+        Batch of images as a single array with leading N dimension.
+    vmin : float, optional
+        Value mapped to 0. By default 0.
+        Defaults to None.
+    vmax : float, optional
+        Value mapped to 255. By default it's based on dtype
+        (1.0 for floats in [0, 1] range, 65535 for uint16, 255 otherwise).
+        Defaults to None.
+    percentiles : (float, float), optional
+        Lower and upper percentiles (0-100) of all values used as `vmin` and `vmax`,
+        e.g. (1, 99) to clip outliers.
+        Defaults to None.
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array of shape (N, H, W) or (N, H, W, C).
+    """  # NOQA E501
+    return _normalize_to_uint8(
+        np.asarray(images), vmin, vmax, percentiles, batch=True)
+
+
+def _is_images_batch(images: Sequence[object]):
+    """Checks if `images` is a batch of images stacked in a single numeric array,
+    i.e. (N, H, W) or (N, H, W, C) (or channel-first (N, C, H, W)) numpy.ndarray.
+    """  # NOQA E501
+    return isinstance(images, np.ndarray) and images.dtype != object \
+        and images.ndim in (3, 4)
+
+
+def _downscale_batch(
+        images: np.ndarray,
+        target_width: int):
+    """Downscales whole batch of uint8 images at once using area (box) interpolation
+    with the largest integer factor which keeps images at least `target_width` wide.
+
+    Parameters
+    ----------
+    images : numpy.ndarray
+        Batch of uint8 images in (N, H, W) or (N, H, W, C) layout.
+    target_width : int
+        Target width (in pixels).
+
+    Returns
+    -------
+    numpy.ndarray
+        Downscaled batch of uint8 images
+        (or the input batch if it can't be downscaled by integer factor).
+    """  # NOQA E501
+    n, h, w = images.shape[:3]
+    factor = w // target_width
+    if factor < 2 or h < factor:
+        return images
+    h2, w2 = h // factor, w // factor
+    # sum strided views of the batch instead of reshaping and averaging
+    # which would require big float temporary arrays
+    acc_dtype = np.uint16 if factor * factor <= 256 else np.uint32
+    acc = np.zeros((n, h2, w2) + images.shape[3:], dtype=acc_dtype)
+    for dy in range(factor):
+        for dx in range(factor):
+            acc += images[:, dy:h2 * factor:factor, dx:w2 * factor:factor]
+    # integer division with rounding
+    acc += factor * factor // 2
+    acc //= factor * factor
+    return acc.astype(np.uint8)
+
+
+@_profiled('decode')
+def _prepare_images_batch(
+        images: np.ndarray,
+        indices: Sequence[int],
+        target_width: int = None,
+        chunk_size: int = 32):
+    """Converts selected rows of images batch to uint8 and downscales them close to `target_width`
+    with vectorized operations working on chunks of rows.
+    Only selected rows are read, so `images` can be a memory-mapped array bigger than RAM.
+
+    Parameters
+    ----------
+    images : numpy.ndarray
+        Batch of images with leading N dimension.
+    indices : Sequence[int]
+        Positions of rows to be prepared.
+    target_width : int, optional
+        Target width (in pixels). If None images will not be rescaled.
+        Defaults to None.
+    chunk_size : int, optional
+        Number of rows processed at once.
+        Defaults to 32.
+
+    Returns
+    -------
+    list of numpy.ndarray
+        List of uint8 images in (H, W) or (H, W, C) layout.
+    """  # NOQA E501
+    out = []
+    indices = np.asarray(indices, dtype=int)
+    for start in range(0, len(indices), chunk_size):
+        chunk = images[indices[start:start + chunk_size]]
+        chunk = _normalize_to_uint8(chunk, batch=True)
+        if target_width:
+            chunk = _downscale_batch(chunk, target_width)
+        out.extend(chunk)
+    return out
 
 
 def _rescale_to_width(
-        img: Image,
+        img: 'PIL.Image',
         target_width: int):
     """Helper function to rescale image to `target_width`.
 
@@ -33,6 +271,31 @@ def _rescale_to_width(
     return rescaled_img
 
 
+def _draft_to_width(
+        img: 'PIL.Image',
+        target_width: int):
+    """Configures not yet loaded JPEG image to be decoded at reduced scale (1/2, 1/4 or 1/8)
+    which is still not smaller than `target_width`, so decoding cost is proportional
+    to the output size rather than the original one. Other images are left untouched.
+
+    Parameters
+    ----------
+    img : PIL.Image
+        Input image object just opened with `PIL.Image.open` (it's modified in place).
+    target_width : int
+        Target width (in pixels) the image will be rescaled to.
+
+    Returns
+    -------
+    PIL.Image
+        The same image object.
+    """  # NOQA E501
+    if img.format == 'JPEG' and target_width and img.size[0] > target_width:
+        w, h = img.size
+        img.draft(img.mode, _scale_wh_by_target_width(w, h, target_width))
+    return img
+
+
 def _scale_wh_by_target_width(w: int, h: int, target_width: int):
     """Helper functions for scaling width and height based on target width.
 
@@ -54,43 +317,462 @@ def _scale_wh_by_target_width(w: int, h: int, target_width: int):
     return int(w * scale), int(h * scale)
 
 
+_MIME_TYPES = {
+    'PNG': 'image/png',
+    'JPEG': 'image/jpeg',
+    'WEBP': 'image/webp',
+}
+
+# formats displayed natively by browsers,
+# files in these formats can be embedded as they are
+_PASSTHROUGH_MIME_TYPES = dict(_MIME_TYPES, GIF='image/gif')
+
+
+def _to_pil(
+        image: str or str_ or bytes or np.ndarray or PIL.Image,
+        target_width: int = None):
+    """Converts image to PIL.Image object.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or bytes or numpy.ndarray or PIL.Image
+        Input image can be either PIL.Image, numpy.ndarray, content of an image file (e.g. downloaded one)
+        or simply a string URL to local image file.
+    target_width : int, optional
+        Target width (in pixels) the image will be downscaled to.
+        Files opened here are configured to be decoded at reduced scale (check `_draft_to_width`),
+        PIL.Image objects provided by the caller are never modified.
+        Defaults to None.
+
+    Returns
+    -------
+    PIL.Image
+        Image object.
+    """  # NOQA E501
+    # PIL is imported only once some image actually needs conversion
+    import PIL.Image
+
+    # if statements to convert image to PIL.Image object
+    if isinstance(image, np.ndarray):
+        image = PIL.Image.fromarray(_normalize_to_uint8(image))
+    elif type(image) is str or type(image) is str_:
+        image = _draft_to_width(PIL.Image.open(image), target_width)
+    elif isinstance(image, bytes):
+        image = _draft_to_width(
+            PIL.Image.open(io.BytesIO(image)), target_width)
+    return image
+
+
+def _resolve_img_format(
+        image: 'PIL.Image',
+        img_format: str = None):
+    """Resolves output format name for the image.
+
+    Parameters
+    ----------
+    image : PIL.Image
+        Image object to be encoded.
+    img_format : str, optional
+        Requested output format, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        `'auto'` picks PNG for images with an alpha channel or few colors (graphics, masks)
+        and JPEG for everything else (photos).
+        Defaults to None (PNG).
+
+    Returns
+    -------
+    str
+        PIL format name, e.g. `'PNG'`.
+    """  # NOQA E501
+    img_format = (img_format or 'png').upper()
+    if img_format == 'JPG':
+        img_format = 'JPEG'
+    if img_format == 'AUTO':
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or \
+            'transparency' in image.info
+        # colors of 16-bit images can be counted only in 32-bit mode
+        colors_image = image.convert('I') \
+            if image.mode.startswith('I;16') else image
+        few_colors = image.mode in ('1', 'P') or \
+            colors_image.getcolors(maxcolors=256) is not None
+        return 'PNG' if has_alpha or few_colors else 'JPEG'
+    if img_format not in _MIME_TYPES:
+        raise ValueError(
+            "`img_format` must be one of: 'png', 'jpeg', 'webp', 'auto'")
+    return img_format
+
+
+def _encode_image(
+        image: str or str_ or np.ndarray or PIL.Image,
+        target_width: int = None,
+        img_format: str = None,
+        quality: int = 85):
+    """Converts image to bytes encoded with selected codec.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or numpy.ndarray or PIL.Image
+        Input image can be either PIL.Image, numpy.ndarray or simply a string URL to local image file.
+    target_width : int, optional
+        Target width (in pixels) to downscale to. If None image will not be rescaled.
+        Defaults to None.
+    img_format : str, optional
+        Output format, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+
+    Returns
+    -------
+    (bytes, str)
+        Encoded image along with its MIME type.
+    """  # NOQA E501
+    with _stage('decode'):
+        image = _to_pil(image, target_width)
+
+        # downscale image based on target_width
+        if target_width and image.size[0] > target_width:
+            image = _rescale_to_width(image, target_width)
+        else:
+            # files are decoded lazily, load them here so that decoding
+            # is not measured as a part of encoding
+            image.load()
+
+    with _stage('encode'):
+        img_format = _resolve_img_format(image, img_format)
+        save_kwargs = {}
+        if img_format == 'JPEG':
+            # JPEG doesn't support transparency nor palette/high bit depth
+            if image.mode not in ('L', 'RGB'):
+                image = image.convert('RGB')
+            save_kwargs['quality'] = quality
+        elif img_format == 'WEBP':
+            if image.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in image.mode or 'transparency' in image.info
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+            save_kwargs['quality'] = quality
+
+        # save image object to bytes stream
+        output = io.BytesIO()
+        image.save(output, format=img_format, **save_kwargs)
+        return output.getvalue(), _MIME_TYPES[img_format]
+
+
 def _img_to_base64(
         image: str or str_ or np.ndarray or PIL.Image,
-        target_width: int = None):
+        target_width: int = None,
+        img_format: str = None,
+        quality: int = 85):
     """Converts image to base64 string.
-    Use `target_width` param to rescale the image to specific width - keeps original size by default.
+    Use `target_width` param to downscale the image to specific width - keeps original size by default.
+    Images narrower than `target_width` are never upscaled.
 
     Parameters
     ----------
     image : str or numpy.str_ or numpy.ndarray or PIL.Image
         Input image can be either PIL.Image, numpy.ndarray or simply a string URL to local or external image file.
     target_width : int, optional
-        Target width (in pixels) to rescale to. If None image will not be rescaled.
+        Target width (in pixels) to downscale to. If None image will not be rescaled.
         Defaults to None.
+    img_format : str, optional
+        Output format, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
 
     Returns
     -------
     str
         Image as base64 string.
     """  # NOQA E501
-    # if statements to convert image to PIL.Image object
-    if isinstance(image, np.ndarray):
-        if image.dtype in [np.float32, np.float64]:
-            # if dtype is float and values range is from 0.0 to 1.0
-            # we need to normalize it to 0-255 range
-            image = image * 255 if image.max() <= 1.0 else image
-            image = PIL.Image.fromarray(image.astype(np.uint8))
-        else:
-            image = PIL.Image.fromarray(image)
-    elif type(image) is str or type(image) is str_:
-        image = PIL.Image.open(image)
-
-    # rescale image based on target_width
-    if target_width:
-        image = _rescale_to_width(image, target_width)
-    # save image object to bytes stream
-    output = io.BytesIO()
-    image.save(output, format='PNG')
+    data, _ = _encode_image(image, target_width, img_format, quality)
     # encode bytes as base64 string
-    b64 = str(base64.b64encode(output.getvalue()).decode('utf-8'))
+    with _stage('encode'):
+        b64 = str(base64.b64encode(data).decode('utf-8'))
     return b64
+
+
+def _get_resize_width(
+        resize: str or bool,
+        img_width: int,
+        zoom_scale: float = 2.5,
+        hidpi_scale: float = 1.0):
+    """Computes target width (in pixels) for images converted to base64
+    based on selected resize mode and display params.
+
+    Parameters
+    ----------
+    resize : str or bool
+        Resize mode, one of:
+        - `None`, `False` or `'off'` - images are embedded in their original size
+        - `'width'` or `True` - images are downscaled to `img_width`
+        - `'zoom'` - images are downscaled to `img_width * zoom_scale` so they stay sharp when zoomed in
+    img_width : int
+        Image width in pixels.
+    zoom_scale : float, optional
+        Scale for zoom-in-on-click feature.
+        Defaults to 2.5.
+    hidpi_scale : float, optional
+        Additional multiplier for high pixel density (HiDPI/retina) screens, e.g. 2.0.
+        Defaults to 1.0.
+
+    Returns
+    -------
+    int or None
+        Target width in pixels or None if images shouldn't be resized.
+    """  # NOQA E501
+    if img_width is None:
+        raise ValueError("`img_width` can't be `None`!")
+    if resize is None or resize is False or resize == 'off':
+        return None
+    if resize is True or resize == 'width':
+        scale = 1.0
+    elif resize == 'zoom':
+        scale = zoom_scale
+    else:
+        raise ValueError(
+            "`resize` must be one of: None, 'off', 'width', 'zoom'")
+    return int(round(img_width * scale * hidpi_scale))
+
+
+def _get_img_size(image: str or str_ or np.ndarray or PIL.Image):
+    """Returns size of in-memory image without decoding or reading any files.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or numpy.ndarray or PIL.Image
+        Input image object or string URL to local/external image file.
+
+    Returns
+    -------
+    (int, int) or None
+        Image size as a tuple (w, h) or None if it's unknown (e.g. for string URLs).
+    """  # NOQA E501
+    if _is_pil_image(image):
+        return image.size
+    if isinstance(image, np.ndarray) and image.ndim >= 2:
+        image = _to_channels_last(image)
+        return image.shape[1], image.shape[0]
+    return None
+
+
+def _needs_b64(
+        image: str or str_ or np.ndarray or PIL.Image,
+        force_b64: bool = False):
+    """Checks if image has to be converted to base64 to be displayed.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or numpy.ndarray or PIL.Image
+        Input image object or string URL to local/external image file.
+    force_b64 : bool, optional
+        Whether conversion to base64 was explicitly requested for string URLs.
+        Remote URLs are downloaded first.
+        Defaults to False.
+
+    Returns
+    -------
+    bool
+        True if image needs base64 conversion.
+    """
+    if type(image) is str or type(image) is str_:
+        return force_b64
+    return True
+
+
+@_profiled('decode')
+def _get_passthrough_mime(
+        image: str or str_ or bytes or np.ndarray or PIL.Image,
+        target_width: int = None):
+    """Checks if image file can be embedded as it is, without decoding and re-encoding.
+    That's the case for files in formats displayed natively by browsers which don't need downscaling.
+    Only the file header is read.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or bytes or numpy.ndarray or PIL.Image
+        Input image object, content of an image file or string URL to local image file.
+    target_width : int, optional
+        Target width (in pixels) to downscale to.
+        Defaults to None.
+
+    Returns
+    -------
+    str or None
+        MIME type of the file or None if image has to be re-encoded.
+    """  # NOQA E501
+    if not (type(image) is str or type(image) is str_ or isinstance(image, bytes)):  # NOQA E501
+        return None
+    with _to_pil(image) as pil_image:
+        if target_width and pil_image.size[0] > target_width:
+            return None
+        return _PASSTHROUGH_MIME_TYPES.get(pil_image.format)
+
+
+@_profiled('encode')
+def _read_file_b64(image: str or str_ or bytes):
+    """Encodes content of an image file (or already read file content) as base64 string.
+    Local files are memory-mapped instead of being read into an intermediate buffer.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or bytes
+        String URL to local image file or content of an image file.
+
+    Returns
+    -------
+    str
+        File content as base64 string.
+    """  # NOQA E501
+    if isinstance(image, bytes):
+        return base64.b64encode(image).decode('utf-8')
+    with open(image, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return base64.b64encode(data).decode('utf-8')
+
+
+def _img_to_data_uri(
+        image: str or str_ or bytes or np.ndarray or PIL.Image,
+        target_width: int = None,
+        img_format: str = None,
+        quality: int = 85):
+    """Converts image to base64 data URI which can be used as `src` of HTML `img` tag.
+    Unless `img_format` is provided, files in formats displayed natively by browsers (JPEG, PNG, GIF, WebP)
+    which don't need downscaling are embedded as they are, without decoding and re-encoding.
+
+    Parameters
+    ----------
+    image : str or numpy.str_ or bytes or numpy.ndarray or PIL.Image
+        Input image can be either PIL.Image, numpy.ndarray, content of an image file or simply a string URL to local image file.
+    target_width : int, optional
+        Target width (in pixels) to downscale to. If None image will not be rescaled.
+        Defaults to None.
+    img_format : str, optional
+        Output format, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (files are embedded as they are if possible, other images are encoded as PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+
+    Returns
+    -------
+    str
+        Image as data URI string with MIME type matching the output format.
+    """  # NOQA E501
+    # explicitly chosen codec is always applied
+    if img_format is None:
+        mime = _get_passthrough_mime(image, target_width)
+        if mime is not None:
+            return 'data:%s;base64,%s' % (mime, _read_file_b64(image))
+
+    data, mime = _encode_image(image, target_width, img_format, quality)
+    with _stage('encode'):
+        return 'data:%s;base64,%s' % (
+            mime, base64.b64encode(data).decode('utf-8'))
+
+
+def _encode_images(
+        images: Sequence[object],
+        force_b64: bool = False,
+        target_width: int = None,
+        img_format: str = None,
+        quality: int = 85,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread'):
+    """Converts all images which require it to base64 data URIs, optionally in parallel.
+    Images which can be displayed directly from their URLs are left untouched.
+    Remote URLs (with `force_b64`) are downloaded concurrently first.
+    Already converted images are taken from the cache (see `ipyplot.cache_info`).
+
+    Parameters
+    ----------
+    images : Sequence[object]
+        List of images to be converted.
+        Currently supports images in the following formats:
+        - str (local/remote URL)
+        - PIL.Image
+        - numpy.ndarray
+    force_b64 : bool, optional
+        Whether string URLs (local and remote) should be converted to base64 as well.
+        Defaults to False.
+    target_width : int, optional
+        Target width (in pixels) to downscale to. If None images will not be rescaled.
+        Defaults to None.
+    img_format : str, optional
+        Output format, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    n_jobs : int, optional
+        Number of parallel workers used for conversion.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Either `'thread'`, `'process'` or a custom executor instance.
+        Defaults to `'thread'`.
+
+    Returns
+    -------
+    list
+        List of the same length as `images` containing data URIs for converted images
+        and `None` for images which should be displayed from their URLs
+        (including remote images which couldn't be downloaded).
+    """  # NOQA E501
+    srcs = [None] * len(images)
+    keys = {}
+    to_encode = []
+    n_cached = 0
+    with _get_executor(n_jobs, parallel_backend) as executor:
+        # images have to be copied to worker processes anyway,
+        # so they are downscaled in vectorized chunks first to send less data
+        batch = _is_images_batch(images) and executor is not None \
+            and not isinstance(executor, ThreadPoolExecutor)
+
+        with _stage('cache'):
+            for i, image in enumerate(images):
+                if not _needs_b64(image, force_b64):
+                    continue
+                if _CACHE.enabled:
+                    # pre-downscaled images differ from serially converted
+                    keys[i] = _cache_key(
+                        image, target_width, img_format, quality, batch)
+                    srcs[i] = _CACHE.get(keys[i])
+                if srcs[i] is None:
+                    to_encode.append(i)
+                else:
+                    n_cached += 1
+
+        if batch:
+            to_encode_imgs = _prepare_images_batch(
+                images, to_encode, target_width)
+        else:
+            to_encode_imgs = [images[i] for i in to_encode]
+            # downloads are I/O bound so they get their own thread pool
+            remote = [
+                j for j, image in enumerate(to_encode_imgs)
+                if _is_remote_url(image)]
+            fetched = _fetch_urls([to_encode_imgs[j] for j in remote])
+            for j, data in zip(remote, fetched):
+                to_encode_imgs[j] = data
+            # images which couldn't be downloaded are displayed from URLs
+            kept = [
+                j for j, image in enumerate(to_encode_imgs)
+                if image is not None]
+            to_encode = [to_encode[j] for j in kept]
+            to_encode_imgs = [to_encode_imgs[j] for j in kept]
+
+        encoded = _parallel_map(
+            partial(
+                _img_to_data_uri, target_width=target_width,
+                img_format=img_format, quality=quality),
+            to_encode_imgs,
+            executor)
+
+    with _stage('cache'):
+        for i, src in zip(to_encode, encoded):
+            srcs[i] = src
+            _CACHE.put(keys.get(i), src)
+    _record_images(len(images), len(to_encode), n_cached, srcs)
+    return srcs
@@ -0,0 +1,273 @@
+"""
+Pager for browsing huge collections of images one page at a time.
+Only images from the displayed page are accessed and converted,
+the next page is converted in the background while the current one is being viewed.
+"""  # NOQA E501
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Sequence
+
+import numpy as np
+
+from ._html_helpers import _create_imgs_grid, _ipython_display
+from ._img_helpers import _encode_images, _get_resize_width
+from ._utils import _is_indexable, _take
+
+
+class Pager(object):
+    """
+    Displays images provided in `images` param in grid-like layout, one page at a time.
+    Use `show` to display the first page and `next`, `prev` or `goto` to browse the pages
+    (the same output is updated in place).
+    Images from the next page are converted to base64 in the background and converted images are cached
+    (see `ipyplot.cache_info`), so moving back and forth doesn't convert the same images again.
+    Call `close` (or use the pager as a context manager) to stop the background thread when done browsing.
+
+    Parameters
+    ----------
+    images : Sequence[object]
+        List of images to be displayed.
+        Currently supports images in the following formats:
+        - str (local/remote URL)
+        - PIL.Image
+        - numpy.ndarray
+        Any sequence or lazily indexable dataset (supporting `len` and integer indexing) can be used.
+        Only images from displayed (and prefetched) pages are accessed.
+    labels : Sequence[str or int], optional
+        List of labels to be displayed above the images.
+        Must be same length as `images`.
+        Defaults to None (positions of images are used).
+    custom_texts : Sequence[str], optional
+        List of custom strings to be drawn above each image.
+        Must be same length as `images`, by default `None`.
+    page_size : int, optional
+        Number of images displayed on each page.
+        Defaults to 30.
+    img_width : int, optional
+        Image width in px, by default 150
+    zoom_scale : float, optional
+        Scale for zoom-in-on-click feature.
+        Best to keep between 1.0~5.0.
+        Defaults to 2.5.
+    show_url : bool, optional
+        Defines if the urls are displayed as text above the images.
+    force_b64 : bool, optional
+        You can force conversion of images to base64 instead of reading them directly from filepaths with HTML.
+        Defaults to False.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1 - either `'thread'` or `'process'`.
+        Custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    resize : str, optional
+        Server-side downscaling of images converted to base64, one of `'zoom'`, `'width'` or `'off'`.
+        Check `ipyplot.plot_images` for details.
+        Defaults to `'zoom'`.
+    hidpi_scale : float, optional
+        Additional multiplier for the downscaling target width.
+        Defaults to 1.0.
+    img_format : str, optional
+        Output format for images converted to base64, one of `'png'`, `'jpeg'`, `'webp'` or `'auto'`.
+        Defaults to None (files which don't need downscaling are embedded as they are, other images are encoded as PNG).
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    lazy_loading : bool, optional
+        Adds `loading="lazy"` and `decoding="async"` attributes to `img` tags.
+        Defaults to `True`.
+    prefetch : bool, optional
+        Whether images from the next page should be converted in a background thread.
+        Disable it if `images` can't be safely accessed from another thread.
+        Defaults to `True`.
+
+    Example
+    -------
+    ```
+    with ipyplot.Pager(images, page_size=50) as pager:
+        pager.show()
+        pager.next()
+    ```
+    """  # NOQA E501
+
+    def __init__(
+            self,
+            images: Sequence[object],
+            labels: Sequence[str or int] = None,
+            custom_texts: Sequence[str] = None,
+            page_size: int = 30,
+            img_width: int = 150,
+            zoom_scale: float = 2.5,
+            show_url: bool = True,
+            force_b64: bool = False,
+            n_jobs: int = None,
+            parallel_backend: str or Executor = 'thread',
+            resize: str = 'zoom',
+            hidpi_scale: float = 1.0,
+            img_format: str = None,
+            quality: int = 85,
+            lazy_loading: bool = True,
+            prefetch: bool = True):
+        if not _is_indexable(images):
+            raise ValueError(
+                "`images` must support `len` and integer indexing")
+        assert(page_size > 0)
+        if labels is not None:
+            assert(len(labels) == len(images))
+        if custom_texts is not None:
+            assert(len(custom_texts) == len(images))
+
+        self.images = images
+        self.labels = labels
+        self.custom_texts = custom_texts
+        self.page_size = page_size
+        self.img_width = img_width
+        self.zoom_scale = zoom_scale
+        self.show_url = show_url
+        self.force_b64 = force_b64
+        self.n_jobs = n_jobs
+        self.parallel_backend = parallel_backend
+        self.resize_width = _get_resize_width(
+            resize, img_width, zoom_scale, hidpi_scale)
+        self.img_format = img_format
+        self.quality = quality
+        self.lazy_loading = lazy_loading
+        self.prefetch = prefetch
+
+        self.page = 0
+        self._handle = None
+        self._executor = None
+        # (page, future) of the page converted in the background
+        self._prefetched = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stops the background thread converting the next page.
+        The pager can still be used afterwards, a new thread is started when needed.
+        """  # NOQA E501
+        prefetched, self._prefetched = getattr(self, '_prefetched', None), None
+        if prefetched is not None:
+            prefetched[1].cancel()
+        executor, self._executor = getattr(self, '_executor', None), None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @property
+    def n_pages(self):
+        """Number of pages."""
+        return max(1, -(-len(self.images) // self.page_size))
+
+    def show(self, page: int = None):
+        """Displays `page` (current page by default) in a new output.
+        Subsequent calls to `next`, `prev` and `goto` update this output in place.
+
+        Parameters
+        ----------
+        page : int, optional
+            Page number (starting from 0).
+            Defaults to None.
+        """
+        if page is not None:
+            self.page = self._check_page(page)
+        display, HTML = _ipython_display()
+        self._handle = display(HTML(self._create_html()), display_id=True)
+
+    def goto(self, page: int):
+        """Displays `page` (starting from 0) in place of the previously displayed one."""
+        self.page = self._check_page(page)
+        html = self._create_html()
+        display, HTML = _ipython_display()
+        if self._handle is None:
+            self._handle = display(HTML(html), display_id=True)
+        else:
+            self._handle.update(HTML(html))
+
+    def next(self):
+        """Displays the next page (if there is one)."""
+        self.goto(min(self.page + 1, self.n_pages - 1))
+
+    def prev(self):
+        """Displays the previous page (if there is one)."""
+        self.goto(max(self.page - 1, 0))
+
+    def _check_page(self, page: int):
+        if page < 0 or page >= self.n_pages:
+            raise ValueError(
+                "`page` must be between 0 and %d" % (self.n_pages - 1))
+        return page
+
+    def _page_indices(self, page: int):
+        start = page * self.page_size
+        return np.arange(start, min(start + self.page_size, len(self.images)))
+
+    def _encode_page(self, page: int):
+        # returns images from the page along with their data URIs
+        images = _take(self.images, self._page_indices(page))
+        srcs = _encode_images(
+            images,
+            force_b64=self.force_b64,
+            target_width=self.resize_width,
+            img_format=self.img_format,
+            quality=self.quality,
+            n_jobs=self.n_jobs,
+            parallel_backend=self.parallel_backend)
+        return images, srcs
+
+    def _get_page(self, page: int):
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None:
+            prefetched_page, future = prefetched
+            if prefetched_page == page:
+                return future.result()
+            future.cancel()
+        return self._encode_page(page)
+
+    def _start_prefetch(self, page: int):
+        if not self.prefetch or page >= self.n_pages:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._prefetched = (
+            page, self._executor.submit(self._encode_page, page))
+
+    def _create_html(self):
+        images, srcs = self._get_page(self.page)
+        indices = self._page_indices(self.page)
+        labels = _take(self.labels, indices) \
+            if self.labels is not None else list(indices)
+        custom_texts = _take(self.custom_texts, indices) \
+            if self.custom_texts is not None else None
+
+        html = '<h4 style="font-size: 12px;">Page %d/%d (images %d-%d of %d)</h4>' % (  # NOQA E501
+            self.page + 1, self.n_pages,
+            indices[0] + 1 if len(indices) else 0,
+            indices[-1] + 1 if len(indices) else 0,
+            len(self.images))
+        html += _create_imgs_grid(
+            images=images,
+            labels=labels,
+            custom_texts=custom_texts,
+            max_images=self.page_size,
+            img_width=self.img_width,
+            zoom_scale=self.zoom_scale,
+            show_url=self.show_url,
+            force_b64=self.force_b64,
+            resize_width=self.resize_width,
+            img_format=self.img_format,
+            quality=self.quality,
+            img_srcs=srcs,
+            lazy_loading=self.lazy_loading)
+
+        # convert the next page while the current one is being viewed
+        self._start_prefetch(self.page + 1)
+        return html
@@ -4,11 +4,14 @@ It contains all the user-facing functions for displaying images in Python Notebo
 """  # NOQA E501
 
 import numpy as _np
+from concurrent.futures import Executor
 from typing import Sequence
 
 from ._html_helpers import (
-    _display_html, _create_tabs, _create_imgs_grid)
-from ._utils import _get_class_representations, _seq2arr
+    _display_html, _display_imgs_grid_progressive, _create_tabs,
+    _create_imgs_grid)
+from ._img_helpers import _get_resize_width
+from ._utils import _get_class_representations, _sample, _seq2arr, _take
 
 
 def plot_class_tabs(
@@ -20,7 +23,18 @@ def plot_class_tabs(
         zoom_scale: float = 2.5,
         show_url: bool = True,
         force_b64: bool = False,
-        tabs_order: Sequence[str or int] = None):
+        tabs_order: Sequence[str or int] = None,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        resize: str = 'zoom',
+        hidpi_scale: float = 1.0,
+        img_format: str = None,
+        quality: int = 85,
+        lazy_tabs: bool = False,
+        lazy_loading: bool = True,
+        layout: str = 'grid',
+        sample: str = 'first',
+        seed: int = None):
     """
     Efficient and convenient way of displaying images in interactive tabs grouped by labels.
     For tabs ordering and filtering check out `tabs_order` param.
@@ -34,6 +48,8 @@ def plot_class_tabs(
         - str (local/remote URL)
         - PIL.Image
         - numpy.ndarray
+        Any sequence, lazily indexable dataset (supporting `len` and integer indexing) or iterator can be used.
+        Only images which end up displayed are accessed.
     labels : Sequence[str or int]
         List of classes/labels for images to be grouped by.
         Must be same length as `images`.
@@ -61,14 +77,68 @@ def plot_class_tabs(
         By default, tabs will be sorted alphabetically based on provided labels.
         This param can be also used as a filtering mechanism - only labels provided in `tabs_order` param will be displayed as tabs.
         Defaults to None.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1.
+        Use `'thread'` (default) or `'process'`. A custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    resize : str, optional
+        Server-side downscaling of images converted to base64 (keeps notebooks small), one of:
+        - `'zoom'` - downscale to `img_width * zoom_scale` so images still look sharp when zoomed in
+        - `'width'` - downscale to `img_width`
+        - `'off'` or `None` - embed images in their original size
+        Images are never upscaled.
+        Defaults to `'zoom'`.
+    hidpi_scale : float, optional
+        Additional multiplier for the downscaling target width, useful for high pixel density (HiDPI/retina) screens.
+        Defaults to 1.0.
+    img_format : str, optional
+        Output format for images converted to base64, one of:
+        - `'png'` - lossless, best for graphics, masks and small images
+        - `'jpeg'` - much smaller and faster to encode for photos
+        - `'webp'` - smaller than JPEG for photos, supported by modern browsers
+        - `'auto'` - PNG for images with alpha channel or few colors, JPEG for the rest
+        Defaults to None - JPEG/PNG/GIF/WebP files which don't need downscaling are embedded as they are
+        (without decoding and re-encoding), other images are encoded as PNG.
+        If a format is provided, all images are re-encoded with it.
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    lazy_tabs : bool, optional
+        If `True` only the first tab is rendered when the output is displayed, other tabs are rendered by the browser when opened.
+        Speeds up displaying plots with many tabs. Requires JavaScript to be enabled for the output (e.g. trusted notebook).
+        Defaults to `False`.
+    lazy_loading : bool, optional
+        Uses browser-native lazy loading (`loading="lazy"`) and async decoding (`decoding="async"`) for images,
+        so off-screen images (e.g. remote URLs) are not fetched until scrolled into view.
+        Explicit image dimensions are set when known to avoid layout reflows.
+        Defaults to `True`.
+    layout : str, optional
+        Either `'grid'` (each image embedded separately) or `'atlas'`.
+        With `'atlas'` thumbnails of all images (in a grid/tab) are composed into one or a few tiled images (sprite sheets)
+        and displayed as CSS-positioned cells, which dramatically cuts payload and render time for big grids.
+        Thumbnails are scaled to the width based on `resize` param (remote URLs are always embedded separately).
+        Defaults to `'grid'`.
+    sample : str, optional
+        Which images are displayed in tabs with more than `max_imgs_per_tab` images, one of:
+        - `'first'` - first images in the order they are stored in
+        - `'random'` - images drawn uniformly at random (without shuffling or copying the input)
+        - `'stratified'` - same as `'random'` (each tab holds a single class already)
+        Defaults to `'first'`.
+    seed : int, optional
+        Seed for random sampling, so the same images are displayed on re-runs.
+        Defaults to None.
     """  # NOQA E501
-    assert(len(images) == len(labels))
+    if hasattr(images, '__len__') and hasattr(labels, '__len__'):
+        assert(len(images) == len(labels))
 
-    # convert to numpy.ndarray for further processing
-    images = _seq2arr(images)
-    labels = _np.asarray(labels)
+    # convert labels to numpy.ndarray for further processing
+    # images and custom texts are accessed only for displayed elements
+    labels = _seq2arr(labels)
     tabs_order = _np.asarray(tabs_order) if tabs_order is not None else tabs_order  # NOQA E501
-    custom_texts = _np.asarray(custom_texts) if custom_texts is not None else custom_texts  # NOQA E501
 
     # run html helper function to generate html content
     html = _create_tabs(
@@ -80,7 +150,18 @@ def plot_class_tabs(
         zoom_scale=zoom_scale,
         show_url=show_url,
         force_b64=force_b64,
-        tabs_order=tabs_order)
+        tabs_order=tabs_order,
+        n_jobs=n_jobs,
+        parallel_backend=parallel_backend,
+        resize_width=_get_resize_width(
+            resize, img_width, zoom_scale, hidpi_scale),
+        img_format=img_format,
+        quality=quality,
+        lazy_tabs=lazy_tabs,
+        lazy_loading=lazy_loading,
+        layout=layout,
+        sample=sample,
+        seed=seed)
 
     _display_html(html)
 
@@ -93,7 +174,18 @@ def plot_images(
         img_width: int = 150,
         zoom_scale: float = 2.5,
         show_url: bool = True,
-        force_b64: bool = False):
+        force_b64: bool = False,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        resize: str = 'zoom',
+        hidpi_scale: float = 1.0,
+        img_format: str = None,
+        quality: int = 85,
+        lazy_loading: bool = True,
+        layout: str = 'grid',
+        progressive: bool = False,
+        sample: str = 'first',
+        seed: int = None):
     """
     Simply displays images provided in `images` param in grid-like layout.
     Check optional params for max number of images to plot, labels and custom texts to add to each image, image width and other options.
@@ -107,6 +199,8 @@ def plot_images(
         - str (local/remote URL)
         - PIL.Image
         - numpy.ndarray
+        Any sequence, lazily indexable dataset (supporting `len` and integer indexing) or iterator can be used.
+        Only images which end up displayed are accessed.
     labels : Sequence[str or int], optional
         List of classes/labels for images to be grouped by.
         Must be same length as `images`.
@@ -130,16 +224,101 @@ def plot_images(
         Do mind that using b64 conversion vs reading directly from filepath will be slower.
         You might need to set this to `True` in environments like Google colab.
         Defaults to False.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1.
+        Use `'thread'` (default) or `'process'`. A custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    resize : str, optional
+        Server-side downscaling of images converted to base64 (keeps notebooks small), one of:
+        - `'zoom'` - downscale to `img_width * zoom_scale` so images still look sharp when zoomed in
+        - `'width'` - downscale to `img_width`
+        - `'off'` or `None` - embed images in their original size
+        Images are never upscaled.
+        Defaults to `'zoom'`.
+    hidpi_scale : float, optional
+        Additional multiplier for the downscaling target width, useful for high pixel density (HiDPI/retina) screens.
+        Defaults to 1.0.
+    img_format : str, optional
+        Output format for images converted to base64, one of:
+        - `'png'` - lossless, best for graphics, masks and small images
+        - `'jpeg'` - much smaller and faster to encode for photos
+        - `'webp'` - smaller than JPEG for photos, supported by modern browsers
+        - `'auto'` - PNG for images with alpha channel or few colors, JPEG for the rest
+        Defaults to None - JPEG/PNG/GIF/WebP files which don't need downscaling are embedded as they are
+        (without decoding and re-encoding), other images are encoded as PNG.
+        If a format is provided, all images are re-encoded with it.
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    lazy_loading : bool, optional
+        Uses browser-native lazy loading (`loading="lazy"`) and async decoding (`decoding="async"`) for images,
+        so off-screen images (e.g. remote URLs) are not fetched until scrolled into view.
+        Explicit image dimensions are set when known to avoid layout reflows.
+        Defaults to `True`.
+    layout : str, optional
+        Either `'grid'` (each image embedded separately) or `'atlas'`.
+        With `'atlas'` thumbnails of all images (in a grid/tab) are composed into one or a few tiled images (sprite sheets)
+        and displayed as CSS-positioned cells, which dramatically cuts payload and render time for big grids.
+        Thumbnails are scaled to the width based on `resize` param (remote URLs are always embedded separately).
+        Defaults to `'grid'`.
+    progressive : bool, optional
+        If `True` the grid is displayed immediately (with blank placeholders for images which need base64 conversion)
+        and updated in place, chunk by chunk, as images are converted, so the first thumbnails show up right away.
+        Requires a frontend supporting updatable displays (e.g. Jupyter). Ignored with `layout='atlas'`.
+        Defaults to `False`.
+    sample : str, optional
+        Which images are displayed if there are more than `max_images` of them, one of:
+        - `'first'` - first images in the order they are stored in
+        - `'random'` - images drawn uniformly at random
+        - `'stratified'` - random images keeping the proportions of labels/classes from `labels` (same as `'random'` without `labels`)
+        Random sampling uses reservoir sampling, so it works with iterators and huge sequences
+        without materializing or shuffling the input. Images are displayed in their original order.
+        Defaults to `'first'`.
+    seed : int, optional
+        Seed for random sampling, so the same images are displayed on re-runs.
+        Defaults to None.
     """  # NOQA E501
 
+    # stratified sampling requires labels of all elements
+    if sample == 'stratified' and labels is not None:
+        labels = _seq2arr(labels)
+
+    # take only elements which will be displayed
+    # without materializing the whole input sequence
+    indices, images = _sample(images, max_images, labels, sample, seed)
     images = _seq2arr(images)
 
     if labels is None:
-        labels = list(range(0, len(images)))
+        labels = indices.tolist()
     else:
-        labels = _np.asarray(labels)
+        labels = _np.asarray(_take(labels, indices))
 
-    custom_texts = _np.asarray(custom_texts) if custom_texts is not None else custom_texts  # NOQA E501
+    custom_texts = _np.asarray(_take(custom_texts, indices)) if custom_texts is not None else custom_texts  # NOQA E501
+
+    resize_width = _get_resize_width(
+        resize, img_width, zoom_scale, hidpi_scale)
+
+    if progressive and layout == 'grid':
+        _display_imgs_grid_progressive(
+            images=images,
+            labels=labels,
+            custom_texts=custom_texts,
+            max_images=max_images,
+            img_width=img_width,
+            zoom_scale=zoom_scale,
+            show_url=show_url,
+            force_b64=force_b64,
+            resize_width=resize_width,
+            img_format=img_format,
+            quality=quality,
+            n_jobs=n_jobs,
+            parallel_backend=parallel_backend,
+            lazy_loading=lazy_loading)
+        return
 
     html = _create_imgs_grid(
         images=images,
@@ -149,7 +328,14 @@ def plot_images(
         img_width=img_width,
         zoom_scale=zoom_scale,
         show_url=show_url,
-        force_b64=force_b64)
+        force_b64=force_b64,
+        n_jobs=n_jobs,
+        parallel_backend=parallel_backend,
+        resize_width=resize_width,
+        img_format=img_format,
+        quality=quality,
+        lazy_loading=lazy_loading,
+        layout=layout)
 
     _display_html(html)
 
@@ -162,7 +348,16 @@ def plot_class_representations(
         show_url: bool = True,
         force_b64: bool = False,
         ignore_labels: Sequence[str or int] = None,
-        labels_order: Sequence[str or int] = None):
+        labels_order: Sequence[str or int] = None,
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread',
+        resize: str = 'zoom',
+        hidpi_scale: float = 1.0,
+        img_format: str = None,
+        quality: int = 85,
+        lazy_loading: bool = True,
+        layout: str = 'grid',
+        progressive: bool = False):
     """
     Displays single image (first occurence for each class) for each label/class in grid-like layout.
     Check optional params for labels filtering, ignoring and ordering, image width and other options.
@@ -176,6 +371,8 @@ def plot_class_representations(
         - str (local/remote URL)
         - PIL.Image
         - numpy.ndarray
+        Any sequence, lazily indexable dataset (supporting `len` and integer indexing) or iterator can be used.
+        Only images which end up displayed are accessed.
     labels : Sequence[str or int]
         List of classes/labels for images to be grouped by.
         Must be same length as `images`.
@@ -200,13 +397,59 @@ def plot_class_representations(
         By default, images will be sorted alphabetically based on provided label.
         This param can be also used as a filtering mechanism - only images for labels provided in `labels_order` param will be displayed.
         Defaults to None.
+    n_jobs : int, optional
+        Number of parallel workers used for converting images to base64.
+        `None` or `1` means images are converted one by one, `-1` uses all available CPU cores.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Backend used when `n_jobs` is greater than 1.
+        Use `'thread'` (default) or `'process'`. A custom `concurrent.futures.Executor` instance can be provided as well.
+        Defaults to `'thread'`.
+    resize : str, optional
+        Server-side downscaling of images converted to base64 (keeps notebooks small), one of:
+        - `'zoom'` - downscale to `img_width * zoom_scale` so images still look sharp when zoomed in
+        - `'width'` - downscale to `img_width`
+        - `'off'` or `None` - embed images in their original size
+        Images are never upscaled.
+        Defaults to `'zoom'`.
+    hidpi_scale : float, optional
+        Additional multiplier for the downscaling target width, useful for high pixel density (HiDPI/retina) screens.
+        Defaults to 1.0.
+    img_format : str, optional
+        Output format for images converted to base64, one of:
+        - `'png'` - lossless, best for graphics, masks and small images
+        - `'jpeg'` - much smaller and faster to encode for photos
+        - `'webp'` - smaller than JPEG for photos, supported by modern browsers
+        - `'auto'` - PNG for images with alpha channel or few colors, JPEG for the rest
+        Defaults to None - JPEG/PNG/GIF/WebP files which don't need downscaling are embedded as they are
+        (without decoding and re-encoding), other images are encoded as PNG.
+        If a format is provided, all images are re-encoded with it.
+    quality : int, optional
+        Quality (1-100) for lossy formats (JPEG and WebP).
+        Defaults to 85.
+    lazy_loading : bool, optional
+        Uses browser-native lazy loading (`loading="lazy"`) and async decoding (`decoding="async"`) for images,
+        so off-screen images (e.g. remote URLs) are not fetched until scrolled into view.
+        Explicit image dimensions are set when known to avoid layout reflows.
+        Defaults to `True`.
+    layout : str, optional
+        Either `'grid'` (each image embedded separately) or `'atlas'`.
+        With `'atlas'` thumbnails of all images (in a grid/tab) are composed into one or a few tiled images (sprite sheets)
+        and displayed as CSS-positioned cells, which dramatically cuts payload and render time for big grids.
+        Thumbnails are scaled to the width based on `resize` param (remote URLs are always embedded separately).
+        Defaults to `'grid'`.
+    progressive : bool, optional
+        If `True` the grid is displayed immediately (with blank placeholders for images which need base64 conversion)
+        and updated in place, chunk by chunk, as images are converted, so the first thumbnails show up right away.
+        Requires a frontend supporting updatable displays (e.g. Jupyter). Ignored with `layout='atlas'`.
+        Defaults to `False`.
     """  # NOQA E501
 
-    assert(len(images) == len(labels))
+    if hasattr(images, '__len__') and hasattr(labels, '__len__'):
+        assert(len(images) == len(labels))
 
-    images = _seq2arr(images)
-
-    labels = _np.asarray(labels)
+    # only first occurrences of each label are taken from `images`
+    labels = _seq2arr(labels)
     ignore_labels = _np.asarray(ignore_labels) if ignore_labels is not None else ignore_labels  # NOQA E501
     labels_order = _np.asarray(labels_order) if labels_order is not None else labels_order  # NOQA E501
 
@@ -220,4 +463,13 @@ def plot_class_representations(
         img_width=img_width,
         zoom_scale=zoom_scale,
         show_url=show_url,
-        force_b64=force_b64)
+        force_b64=force_b64,
+        n_jobs=n_jobs,
+        parallel_backend=parallel_backend,
+        resize=resize,
+        hidpi_scale=hidpi_scale,
+        img_format=img_format,
+        quality=quality,
+        lazy_loading=lazy_loading,
+        layout=layout,
+        progressive=progressive)
@@ -0,0 +1,204 @@
+"""
+Opt-in profiling of plotting calls: wall time spent in each stage of the rendering pipeline
+along with number of converted images and sizes of embedded images and HTML output.
+"""  # NOQA E501
+
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# stages of the rendering pipeline in order of execution
+_STAGES = (
+    'seq2arr', 'grouping', 'fetch', 'cache', 'decode', 'encode',
+    'workers', 'html', 'display')
+
+# stack of active profiles, each plotting call records into all of them
+_PROFILES = []
+_LOCK = threading.Lock()
+# per-thread stack of times spent in nested stages
+_LOCAL = threading.local()
+
+
+class _Profile(object):
+    """Accumulates measurements of plotting calls made within `profile` block."""  # NOQA E501
+
+    def __init__(self):
+        self.stages = dict.fromkeys(_STAGES, 0.0)
+        self.images = 0
+        self.converted = 0
+        self.cache_hits = 0
+        self.embedded_images = 0
+        self.embedded_bytes = 0
+        self.max_image_bytes = 0
+        self.output_bytes = 0
+
+    def stats(self, total_time: float):
+        return {
+            'total_time': total_time,
+            'stages': dict(self.stages),
+            'images': self.images,
+            'converted': self.converted,
+            'cache_hits': self.cache_hits,
+            'embedded_images': self.embedded_images,
+            'embedded_bytes': self.embedded_bytes,
+            'bytes_per_image': (
+                self.embedded_bytes / self.embedded_images
+                if self.embedded_images else 0.0),
+            'max_image_bytes': self.max_image_bytes,
+            'output_bytes': self.output_bytes,
+        }
+
+
+@contextmanager
+def _stage(name: str):
+    """Context manager measuring wall time of a pipeline stage in active profiles.
+    Time spent in nested stages is excluded, so stage times add up.
+    """  # NOQA E501
+    if not _PROFILES:
+        yield
+        return
+    stack = _LOCAL.__dict__.setdefault('stack', [])
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with _LOCK:
+            for prof in _PROFILES:
+                prof.stages[name] += elapsed - nested
+
+
+def _profiled(name: str):
+    """Decorator measuring each call of the function as pipeline stage `name` (see `_stage`)."""  # NOQA E501
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _PROFILES:
+                return func(*args, **kwargs)
+            with _stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record_images(
+        n_images: int,
+        n_converted: int,
+        n_cached: int,
+        srcs: list):
+    """Records number of images passed to conversion, number of images actually converted
+    and taken from cache (the rest is displayed from URLs) and sizes of embedded data URIs.
+    """  # NOQA E501
+    if not _PROFILES:
+        return
+    sizes = [len(src) for src in srcs if src is not None]
+    with _LOCK:
+        for prof in _PROFILES:
+            prof.images += n_images
+            prof.converted += n_converted
+            prof.cache_hits += n_cached
+            prof.embedded_images += len(sizes)
+            prof.embedded_bytes += sum(sizes)
+            prof.max_image_bytes = max([prof.max_image_bytes] + sizes)
+
+
+def _record_output(html: str):
+    """Records size of HTML code sent to display (or captured)."""
+    if not _PROFILES:
+        return
+    with _LOCK:
+        for prof in _PROFILES:
+            prof.output_bytes += len(html)
+
+
+def _format_stats(stats: dict):
+    stages = ', '.join(
+        '%s %.3fs' % (name, t) for name, t in stats['stages'].items() if t)
+    return (
+        'total %.3fs (%s); %d images (%d converted, %d from cache), '
+        '%d embedded: %.1f KB (%.1f KB per image, max %.1f KB); '
+        'output %.1f KB' % (
+            stats['total_time'], stages or '-', stats['images'],
+            stats['converted'], stats['cache_hits'],
+            stats['embedded_images'], stats['embedded_bytes'] / 1024,
+            stats['bytes_per_image'] / 1024, stats['max_image_bytes'] / 1024,
+            stats['output_bytes'] / 1024))
+
+
+@contextmanager
+def profile(
+        callback: Callable = None,
+        logger: str or logging.Logger = None,
+        level: int = logging.INFO):
+    """
+    Context manager profiling all plotting calls made within its block.
+    Yields a dictionary which is filled with the measurements when the block exits:
+    - `total_time` - wall time of the whole block (in seconds)
+    - `stages` - wall time (in seconds) spent in each stage of the rendering pipeline:
+        - `seq2arr` - converting input sequences to numpy arrays
+        - `grouping` - grouping images by labels (tabs, class representations) and sampling
+        - `fetch` - downloading remote images (with `force_b64`)
+        - `cache` - computing cache keys and cache lookups
+        - `decode` - reading and decoding images and downscaling them
+        - `encode` - encoding images (PNG/JPEG/WebP) and base64
+        - `workers` - waiting for parallel workers (with `n_jobs`); decode/encode times of thread workers
+          are summed over all workers and times of process workers are not measured
+        - `html` - building HTML code
+        - `display` - displaying HTML with IPython
+      Times of nested stages are excluded, so stage times add up to at most `total_time`.
+    - `images` - number of images passed to conversion
+    - `converted` - number of images actually converted (not taken from cache)
+    - `cache_hits` - number of images taken from cache
+    - `embedded_images`, `embedded_bytes`, `bytes_per_image` and `max_image_bytes` - number and sizes of images embedded as base64
+    - `output_bytes` - total size of HTML code sent to display
+
+    Parameters
+    ----------
+    callback : Callable, optional
+        Function called with the measurements dictionary when the block exits,
+        e.g. to send them to a monitoring system.
+        Defaults to None.
+    logger : str or logging.Logger, optional
+        Logger (or its name) the measurements are logged with when the block exits.
+        Dictionary with measurements is attached to the log record as `ipyplot_profile` attribute.
+        Defaults to None (nothing is logged).
+    level : int, optional
+        Logging level.
+        Defaults to `logging.INFO`.
+
+    Example
+    -------
+    ```
+    with ipyplot.profile(logger='ipyplot') as stats:
+        ipyplot.plot_class_tabs(images, labels)
+    print(stats['stages'])
+    ```
+    """  # NOQA E501
+    stats = {}
+    prof = _Profile()
+    with _LOCK:
+        _PROFILES.append(prof)
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        total_time = time.perf_counter() - start
+        with _LOCK:
+            _PROFILES.remove(prof)
+        stats.update(prof.stats(total_time))
+
+    if callback is not None:
+        callback(stats)
+    if logger is not None:
+        if isinstance(logger, str):
+            logger = logging.getLogger(logger)
+        logger.log(
+            level, 'IPyPlot profile: %s', _format_stats(stats),
+            extra={'ipyplot_profile': stats})
@@ -2,10 +2,17 @@
 Misc utils for IPyPlot package.
 """
 
-from typing import Sequence
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Sequence
 
 import numpy as np
-from PIL import Image
+
+from ._profiling import _profiled, _stage
 
 
 def _get_class_representations(
@@ -43,10 +50,32 @@ def _get_class_representations(
         Returns a tuple containing an array of images along with associated labels (out_images, out_labels).
     """  # NOQA E501
 
+    indices, out_labels = _get_class_representation_indices(
+        labels, ignore_labels, labels_order)
+    # only images which are actually selected are touched
+    out_images = _seq2arr(_take(images, indices))
+
+    return out_images, out_labels
+
+
+@_profiled('grouping')
+def _get_class_representation_indices(
+        labels: Sequence[str or int],
+        ignore_labels: Sequence[str or int] = None,
+        labels_order: Sequence[str or int] = None):
+    """Returns positions (and labels) of first occurance of each label/class type.
+    Check `_get_class_representations` for params description.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        Returns a tuple containing an array of indices along with associated labels (indices, out_labels).
+    """  # NOQA E501
+
     # convert everything to numpy.ndarray
     # required for further filtering and ordering operations
-    images = np.asarray(images)
-    labels = np.asarray(labels)
+    labels = _seq2arr(labels)
+    indices = np.arange(len(labels))
     ignore_labels = np.asarray(ignore_labels) if ignore_labels is not None else ignore_labels  # NOQA E501
     labels_order = np.asarray(labels_order) if labels_order is not None else labels_order  # NOQA E501
 
@@ -54,29 +83,47 @@ def _get_class_representations(
     if ignore_labels is not None:
         not_labeled_mask = np.isin(labels, ignore_labels)
         labels = labels[~not_labeled_mask]
-        images = images[~not_labeled_mask]
+        indices = indices[~not_labeled_mask]
+
+    # single pass finding first occurrence of each unique label
+    out_labels, first_indices = np.unique(labels, return_index=True)
 
     if labels_order is not None:
-        # create idices mask based on ordered labels provided
-        labels_order_mask = [
-            np.where(labels == label)[0][0]
-            for label in labels_order
-            if len(np.where(labels == label)[0]) > 0
-        ]
-        # note that this will not only order labels and images
-        # but it will filter them as well
-        out_images = images[labels_order_mask]
-        out_labels = labels[labels_order_mask]
-    else:
-        # if no filtering/ordering was provided
-        # use uniques from labels list as indices mask
-        uniques = np.unique(labels, return_index=True)
-        out_labels = uniques[0]
-        out_images = images[uniques[1]]
+        # order (and filter) uniques based on provided labels order
+        # labels which don't occur in `labels` are silently skipped
+        lookup = {label: i for i, label in enumerate(out_labels.tolist())}
+        order_mask = np.asarray([
+            lookup[label]
+            for label in labels_order.tolist()
+            if label in lookup
+        ], dtype=int)
+        out_labels = out_labels[order_mask]
+        first_indices = first_indices[order_mask]
 
-    return out_images, out_labels
+    out_indices = indices[first_indices]
 
+    return out_indices, out_labels
 
+
+def _is_pil_image(obj: object):
+    """Checks if `obj` is a PIL.Image object without importing PIL.
+    If PIL hasn't been imported yet, `obj` can't be an image created with it.
+
+    Parameters
+    ----------
+    obj : object
+        Object to be checked.
+
+    Returns
+    -------
+    bool
+        True if `obj` is a PIL.Image object.
+    """
+    pil_image = sys.modules.get('PIL.Image')
+    return pil_image is not None and isinstance(obj, pil_image.Image)
+
+
+@_profiled('seq2arr')
 def _seq2arr(seq: Sequence[str or int or object]):
     """Convert sequence to numpy.ndarray.
 
@@ -90,8 +137,421 @@ def _seq2arr(seq: Sequence[str or int or object]):
     numpy.ndarray
         Array of elements
     """
+    # iterators/generators have to be consumed first
+    if not hasattr(seq, '__len__'):
+        seq = list(seq)
+    # by position, `seq[0]` looks pandas.Series up by index label
+    first = _take_first(seq, 1)
     # this is a hack to make the code work with PIL images
-    if issubclass(type(seq[0]), Image.Image):
-        return np.asarray(seq, dtype=type(seq[0]))
+    if len(first) > 0 and _is_pil_image(first[0]):
+        return np.asarray(seq, dtype=type(first[0]))
     else:
         return np.asarray(seq)
+
+
+@contextmanager
+def _get_executor(
+        n_jobs: int = None,
+        parallel_backend: str or Executor = 'thread'):
+    """Context manager providing an executor for parallel processing.
+
+    Parameters
+    ----------
+    n_jobs : int, optional
+        Number of parallel workers.
+        `None` or `1` means no executor (serial processing),
+        `-1` means one worker per available CPU core.
+        Defaults to None.
+    parallel_backend : str or concurrent.futures.Executor, optional
+        Either `'thread'`, `'process'` or an existing executor instance.
+        Executor instances are used as they are (`n_jobs` is ignored)
+        and are not shut down on exit.
+        Defaults to `'thread'`.
+
+    Yields
+    ------
+    concurrent.futures.Executor or None
+        Executor instance or `None` if processing should be serial.
+    """
+    if isinstance(parallel_backend, Executor):
+        yield parallel_backend
+        return
+
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs is None or n_jobs <= 1:
+        yield None
+        return
+
+    if parallel_backend == 'thread':
+        executor = ThreadPoolExecutor(max_workers=n_jobs)
+    elif parallel_backend == 'process':
+        executor = ProcessPoolExecutor(max_workers=n_jobs)
+    else:
+        raise ValueError(
+            "`parallel_backend` must be either 'thread', 'process' "
+            "or an instance of concurrent.futures.Executor")
+
+    try:
+        yield executor
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _parallel_map(
+        func: Callable,
+        seq: Sequence[object],
+        executor: Executor = None):
+    """Applies `func` to every element of `seq` preserving the input order.
+
+    Parameters
+    ----------
+    func : Callable
+        Function to be applied. Must be picklable for process based executors.
+    seq : Sequence[object]
+        Input sequence of elements.
+    executor : concurrent.futures.Executor, optional
+        Executor used to run `func` concurrently.
+        If None elements are processed serially.
+        Defaults to None.
+
+    Returns
+    -------
+    list
+        List of results in the same order as `seq`.
+    """
+    if executor is None or len(seq) <= 1:
+        return [func(x) for x in seq]
+    with _stage('workers'):
+        return list(executor.map(func, seq))
+
+
+def _is_remote_url(image: object):
+    """Checks if image is a string URL to a remote (http/https) file."""
+    return isinstance(image, str) \
+        and image.lower().startswith(('http://', 'https://'))
+
+
+def _is_indexable(seq: Sequence[object]):
+    """Checks if elements of `seq` can be accessed by integer position."""
+    return hasattr(seq, '__len__') and hasattr(seq, '__getitem__')
+
+
+def _take_first(
+        seq: Sequence[object],
+        n: int):
+    """Returns first `n` elements of `seq` without touching the remaining ones.
+    Works with numpy.ndarray (including memory-mapped arrays), pandas.Series,
+    any sequence/dataset supporting `len` and integer indexing, and iterators.
+
+    Parameters
+    ----------
+    seq : Sequence[object]
+        Input sequence, lazily indexable dataset or iterator.
+    n : int
+        Number of elements to take.
+
+    Returns
+    -------
+    numpy.ndarray or list
+        First `n` elements (a view for numpy.ndarray inputs).
+    """  # NOQA E501
+    if isinstance(seq, np.ndarray):
+        return seq[:n]
+    if hasattr(seq, 'iloc'):
+        return np.asarray(seq.iloc[:n])
+    if _is_indexable(seq):
+        return [seq[i] for i in range(min(n, len(seq)))]
+    return list(itertools.islice(seq, n))
+
+
+def _take(
+        seq: Sequence[object],
+        indices: Sequence[int]):
+    """Returns elements of `seq` at positions given by `indices`
+    without touching the remaining ones.
+    Works with numpy.ndarray (including memory-mapped arrays), pandas.Series,
+    any sequence/dataset supporting `len` and integer indexing, and iterators
+    (consumed in a single pass up to the largest index).
+
+    Parameters
+    ----------
+    seq : Sequence[object]
+        Input sequence, lazily indexable dataset or iterator.
+    indices : Sequence[int]
+        Positions of elements to take.
+
+    Returns
+    -------
+    numpy.ndarray or list
+        Selected elements in the order given by `indices`.
+    """  # NOQA E501
+    indices = np.asarray(indices, dtype=int)
+    if isinstance(seq, np.ndarray):
+        return seq[indices]
+    if hasattr(seq, 'iloc'):
+        return np.asarray(seq.iloc[indices])
+    if _is_indexable(seq):
+        return [seq[i] for i in indices]
+
+    wanted = set(indices.tolist())
+    found = {}
+    if wanted:
+        last = max(wanted)
+        for i, x in enumerate(seq):
+            if i in wanted:
+                found[i] = x
+            if i >= last:
+                break
+    return [found[i] for i in indices]
+
+
+@_profiled('grouping')
+def _group_indices_by_label(
+        labels: Sequence[str or int],
+        labels_order: Sequence[str or int] = None,
+        max_per_label: int = None,
+        sample: str = 'first',
+        seed: int = None):
+    """Groups positions of elements by their labels in a single pass over `labels`
+    (instead of comparing the whole `labels` array with each label separately).
+
+    Parameters
+    ----------
+    labels : Sequence[str or int]
+        List of classes/labels.
+    labels_order : Sequence[str or int], optional
+        Labels (and their order) to group by.
+        Labels which don't occur in `labels` get empty groups.
+        By default sorted unique values from `labels` are used.
+        Defaults to None.
+    max_per_label : int, optional
+        Max number of positions kept for each label (first occurrences are kept).
+        Defaults to None (no limit).
+    sample : str, optional
+        Which positions are kept for labels with more than `max_per_label` elements,
+        either `'first'` occurrences or `'random'`/`'stratified'` ones (same thing within a single label).
+        Defaults to `'first'`.
+    seed : int, optional
+        Seed for random sampling.
+        Defaults to None.
+
+    Returns
+    -------
+    (numpy.ndarray, list of numpy.ndarray)
+        Returns a tuple containing labels order along with a list of
+        positions (in ascending order) for each of them (labels_order, groups).
+    """  # NOQA E501
+    if sample not in _SAMPLE_METHODS:
+        raise ValueError(
+            "`sample` must be one of %s" % ', '.join(_SAMPLE_METHODS))
+    rng = np.random.default_rng(seed)
+
+    labels = np.asarray(labels)
+    uniques, inverse = np.unique(labels, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # stable sort keeps original order of elements within each label
+    order = np.argsort(inverse, kind='stable')
+    counts = np.bincount(inverse, minlength=len(uniques))
+    starts = np.cumsum(counts) - counts
+
+    if labels_order is None:
+        labels_order = uniques
+    lookup = {label: i for i, label in enumerate(uniques.tolist())}
+
+    groups = []
+    for label in np.asarray(labels_order).tolist():
+        i = lookup.get(label)
+        if i is None:
+            groups.append(np.zeros(0, dtype=order.dtype))
+            continue
+        if max_per_label is not None and sample != 'first':
+            group = order[starts[i]:starts[i] + counts[i]]
+            groups.append(group[_reservoir_sample_positions(
+                len(group), max_per_label, rng)])
+            continue
+        count = counts[i] if max_per_label is None \
+            else min(counts[i], max_per_label)
+        groups.append(order[starts[i]:starts[i] + count])
+
+    return labels_order, groups
+
+
+_SAMPLE_METHODS = ('first', 'random', 'stratified')
+
+
+def _reservoir_replacements(
+        k: int,
+        rng: np.random.Generator):
+    """Generates replacements for reservoir sampling of `k` elements (Algorithm L).
+    Number of elements to skip before each replacement is drawn directly,
+    so elements in between don't require any random numbers.
+
+    Parameters
+    ----------
+    k : int
+        Reservoir size.
+    rng : numpy.random.Generator
+        Random numbers generator.
+
+    Yields
+    ------
+    (int, int)
+        Number of elements to skip and the reservoir slot to be replaced by the next element.
+    """  # NOQA E501
+    def uniform():
+        # open (0, 1) interval, so logarithms are always finite
+        u = rng.random()
+        while u == 0.0:
+            u = rng.random()
+        return u
+
+    # log(w) is tracked instead of w to keep precision for big k
+    log_w = math.log(uniform()) / k
+    while True:
+        skip = int(math.log(uniform()) / math.log(-math.expm1(log_w)))
+        yield skip, rng.integers(k)
+        log_w += math.log(uniform()) / k
+
+
+def _reservoir_sample_positions(
+        n: int,
+        k: int,
+        rng: np.random.Generator):
+    """Selects `k` random positions out of `n` in O(k * (1 + log(n / k))) time and O(k) memory.
+
+    Parameters
+    ----------
+    n : int
+        Number of elements.
+    k : int
+        Number of positions to select.
+        All positions are selected if `n` is smaller.
+    rng : numpy.random.Generator
+        Random numbers generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        Selected positions in ascending order.
+    """  # NOQA E501
+    reservoir = list(range(min(n, k)))
+    if k > 0 and n > k:
+        i = k - 1
+        for skip, slot in _reservoir_replacements(k, rng):
+            i += skip + 1
+            if i >= n:
+                break
+            reservoir[slot] = i
+    return np.sort(np.asarray(reservoir, dtype=int))
+
+
+def _reservoir_sample(
+        seq: Sequence[object],
+        k: int,
+        rng: np.random.Generator):
+    """Selects `k` random elements of `seq` in a single pass with O(k) memory using reservoir sampling.
+    Skipped elements are only stepped over.
+
+    Parameters
+    ----------
+    seq : Sequence[object]
+        Input sequence or iterator.
+    k : int
+        Number of elements to select.
+        All elements are selected if `seq` is shorter.
+    rng : numpy.random.Generator
+        Random numbers generator.
+
+    Returns
+    -------
+    (numpy.ndarray, list)
+        Returns a tuple of positions (in ascending order) of selected elements along with the elements.
+    """  # NOQA E501
+    items = enumerate(seq)
+    reservoir = list(itertools.islice(items, k))
+    if k > 0 and len(reservoir) == k:
+        for skip, slot in _reservoir_replacements(k, rng):
+            item = next(itertools.islice(items, skip, None), None)
+            if item is None:
+                break
+            reservoir[slot] = item
+
+    reservoir.sort(key=lambda item: item[0])
+    return (
+        np.asarray([i for i, _ in reservoir], dtype=int),
+        [x for _, x in reservoir])
+
+
+def _get_stratified_quotas(
+        counts: Sequence[int],
+        k: int):
+    """Splits `k` between groups proportionally to their sizes (largest remainder method)."""  # NOQA E501
+    counts = np.asarray(counts, dtype=int)
+    total = counts.sum()
+    k = min(k, total)
+    if total == 0:
+        return counts
+    exact = counts * k / total
+    quotas = np.floor(exact).astype(int)
+    remainders = np.argsort(quotas - exact, kind='stable')
+    quotas[remainders[:k - quotas.sum()]] += 1
+    return quotas
+
+
+@_profiled('grouping')
+def _sample(
+        seq: Sequence[object],
+        k: int,
+        labels: Sequence[str or int] = None,
+        sample: str = 'first',
+        seed: int = None):
+    """Selects up to `k` elements of `seq` without materializing the whole sequence.
+
+    Parameters
+    ----------
+    seq : Sequence[object]
+        Input sequence, lazily indexable dataset or iterator.
+    k : int
+        Number of elements to select.
+    labels : Sequence[str or int], optional
+        Labels of all elements in `seq`, used for stratified sampling.
+        Defaults to None.
+    sample : str, optional
+        Sampling method:
+        - `'first'` - first `k` elements
+        - `'random'` - `k` elements drawn uniformly at random (reservoir sampling)
+        - `'stratified'` - random elements with the same labels distribution as the whole `seq`
+        (same as `'random'` if `labels` are not provided)
+        Defaults to `'first'`.
+    seed : int, optional
+        Seed for random sampling.
+        Defaults to None.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray or list)
+        Returns a tuple of positions (in ascending order) of selected elements along with the elements.
+    """  # NOQA E501
+    if sample not in _SAMPLE_METHODS:
+        raise ValueError(
+            "`sample` must be one of %s" % ', '.join(_SAMPLE_METHODS))
+
+    if sample == 'first':
+        elements = _take_first(seq, k)
+        return np.arange(len(elements)), elements
+
+    rng = np.random.default_rng(seed)
+    if sample == 'stratified' and labels is not None:
+        _, groups = _group_indices_by_label(labels)
+        quotas = _get_stratified_quotas([len(g) for g in groups], k)
+        indices = np.sort(np.concatenate([np.zeros(0, dtype=int)] + [
+            group[_reservoir_sample_positions(len(group), quota, rng)]
+            for group, quota in zip(groups, quotas)]))
+        return indices, _take(seq, indices)
+
+    if _is_indexable(seq):
+        # only positions are sampled, elements are accessed afterwards
+        indices = _reservoir_sample_positions(len(seq), k, rng)
+        return indices, _take(seq, indices)
+    return _reservoir_sample(seq, k, rng)
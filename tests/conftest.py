@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+from ipyplot import _html_helpers, _img_helpers, _pager
+
+
+@pytest.fixture
+def offline_fetch(monkeypatch):
+    # remote images are served from a local file so tests don't depend on network  # NOQA E501
+    with open('docs/example1-tabs.jpg', 'rb') as f:
+        data = f.read()
+    monkeypatch.setattr(
+        _img_helpers, '_fetch_urls', lambda urls: [data for _ in urls])
+
+
+@pytest.fixture
+def displayed(monkeypatch):
+    # HTML code displayed (or updated in place) instead of IPython output
+    from IPython.display import HTML
+    outputs = []
+
+    class DisplayHandle(object):
+        def update(self, obj):
+            outputs.append(obj.data)
+
+    def display(obj, display_id=None):
+        outputs.append(obj.data)
+        return DisplayHandle()
+
+    for module in (_html_helpers, _pager):
+        monkeypatch.setattr(
+            module, '_ipython_display', lambda: (display, HTML))
+    return outputs
+
+
+class LazyDataset(object):
+    """Dataset-like object recording which elements were accessed
+    and failing when element not listed in `allowed` is accessed."""
+
+    def __init__(self, items, allowed=None):
+        self.items = items
+        self.allowed = allowed
+        self.accessed = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        assert self.allowed is None or i in self.allowed
+        self.accessed.append(int(i))
+        return self.items[i]
@@ -0,0 +1,111 @@
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+from ipyplot import _atlas
+from ipyplot._atlas import _create_atlases, _pack_thumbnails
+from ipyplot._html_helpers import _create_imgs_grid, _create_tabs
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (6, 32, 64, 3)), dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "sizes, max_size, out_atlases, out_placements",
+    [
+        ([], 100, [], []),
+        (
+            [(40, 10), (40, 20), (40, 10)], 100,
+            [(80, 30)], [(0, 0, 0), (0, 40, 0), (0, 0, 20)]
+        ),
+        (
+            [(40, 60), (40, 60), (40, 60)], 100,
+            [(80, 60), (40, 60)], [(0, 0, 0), (0, 40, 0), (1, 0, 0)]
+        ),
+    ])
+def test_pack_thumbnails(sizes, max_size, out_atlases, out_placements):
+    atlases, placements = _pack_thumbnails(sizes, max_size)
+    assert atlases == out_atlases
+    assert placements == out_placements
+
+
+def test_create_atlases():
+    images = BASE_NP_IMGS + ['https://example.com/img.png']
+    atlases, cells = _create_atlases(images, thumb_width=16)
+    assert len(atlases) == 1
+    assert atlases[0][0].startswith('data:image/png;base64,')
+    assert cells[-1] is None
+    assert all(cell[3:] == (16, 8) for cell in cells[:-1])
+    # cells don't overlap
+    assert len(set(cell[1:3] for cell in cells[:-1])) == len(BASE_NP_IMGS)
+
+
+def test_create_atlases_local_path_with_http(tmp_path):
+    # only remote URLs are skipped, not paths which happen to contain "http"
+    path = tmp_path / 'http_imgs' / 'a.jpg'
+    path.parent.mkdir()
+    shutil.copy('docs/example1-tabs.jpg', str(path))
+    _, cells = _create_atlases([str(path)], thumb_width=16)
+    assert cells[0] is not None
+
+
+def test_create_atlases_force_b64(monkeypatch):
+    with open('docs/example1-tabs.jpg', 'rb') as f:
+        data = f.read()
+    # the second download fails
+    monkeypatch.setattr(
+        _atlas, '_fetch_urls', lambda urls: [data, None][:len(urls)])
+    images = BASE_NP_IMGS[:1] + [
+        'https://example.com/a.jpg', 'https://example.com/b.jpg']
+    _, cells = _create_atlases(images, thumb_width=16, force_b64=True)
+    assert cells[0] is not None and cells[1] is not None
+    assert cells[2] is None
+
+
+def test_create_atlases_small_images():
+    # images narrower than `thumb_width` are not upscaled
+    images = [BASE_NP_IMGS[0], BASE_NP_IMGS[1][:, :16]]
+    atlases, cells = _create_atlases(images, thumb_width=128)
+    assert cells[0][3:] == (64, 32)
+    assert cells[1][3:] == (16, 32)
+    assert atlases[0][1] == (80, 32)
+
+
+def test_create_imgs_grid_atlas_small_images():
+    images = [BASE_NP_IMGS[0], BASE_NP_IMGS[1][:, :16]]
+    html = _create_imgs_grid(
+        images, labels=[0, 1], img_width=32, resize_width=128,
+        layout='atlas')
+    # cells are displayed in `img_width` whatever the thumbnail size is
+    assert 'width: 32px; height: 16px; background-position: -0px -0px; background-size: 40px 16px;' in html  # NOQA E501
+    assert 'width: 32px; height: 64px; background-position: -128px -0px; background-size: 160px 64px;' in html  # NOQA E501
+
+
+def test_create_imgs_grid_atlas():
+    images = BASE_NP_IMGS + ['https://example.com/img.png']
+    html = _create_imgs_grid(
+        images, labels=list(range(len(images))), img_width=32,
+        resize_width=64, layout='atlas')
+    # single embedded image for all thumbnails, remote URL kept as is
+    assert html.count('data:image/png;base64,') == 1
+    assert html.count('<img ') == 1
+    assert html.count('background-position:') == len(BASE_NP_IMGS)
+    # atlas thumbnails are 2x bigger than displayed images
+    assert 'width: 32px; height: 16px;' in html
+
+
+def test_create_tabs_atlas():
+    html = _create_tabs(
+        BASE_NP_IMGS, np.asarray(['a', 'b', 'a', 'b', 'a', 'b']),
+        layout='atlas')
+    assert html.count('data:image/png;base64,') == 2
+
+
+def test_create_imgs_grid_invalid_layout():
+    with pytest.raises(ValueError):
+        _create_imgs_grid(BASE_NP_IMGS, labels=[0] * 6, layout='masonry')
@@ -0,0 +1,115 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot._cache import _B64Cache, _cache_key
+from ipyplot._img_helpers import _encode_images
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (3, 32, 32, 3)), dtype=np.uint8))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    ipyplot.configure_cache(enabled=True, disk_dir='')
+    ipyplot.clear_cache()
+    yield
+    ipyplot.configure_cache(enabled=True, max_bytes=128 * 1024 ** 2)
+    ipyplot.clear_cache()
+
+
+def test_lru_eviction_by_size():
+    cache = _B64Cache(max_bytes=10)
+    cache.put('a', '1234')
+    cache.put('b', '1234')
+    assert cache.get('a') == '1234'
+    # 'b' is now least recently used and gets evicted
+    cache.put('c', '1234')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1234'
+    assert cache.get('c') == '1234'
+    assert cache.info()['size_bytes'] == 8
+
+
+def test_disk_tier(tmp_path):
+    cache = _B64Cache(max_bytes=4, disk_dir=str(tmp_path))
+    cache.put('a', '1234')
+    cache.put('b', '1234')
+    assert cache.get('a') == '1234'
+    assert cache.info()['disk_hits'] == 1
+
+    # new cache instance pointing to the same dir reuses entries
+    cache = _B64Cache(disk_dir=str(tmp_path))
+    assert cache.get('b') == '1234'
+
+
+def test_disk_tier_write_failure(tmp_path):
+    # file in place of the directory makes every write fail
+    disk_dir = tmp_path / 'not-a-dir'
+    disk_dir.write_text('')
+    cache = _B64Cache(disk_dir=str(disk_dir))
+    cache.put('a', '1234')
+    assert cache.get('a') == '1234'
+
+
+def test_set_max_bytes():
+    cache = _B64Cache(max_bytes=10)
+    cache.put('a', '1234')
+    cache.put('b', '1234')
+    cache.set_max_bytes(6)
+    assert cache.get('a') is None
+    assert cache.get('b') == '1234'
+    assert cache.info()['size_bytes'] == 4
+
+
+def test_cache_key_changes():
+    img = BASE_NP_IMGS[0].copy()
+    key = _cache_key(img, 150, 'png')
+    assert key == _cache_key(img.copy(), 150, 'png')
+    assert key != _cache_key(img, 100, 'png')
+    img[0, 0, 0] += 1
+    assert key != _cache_key(img, 150, 'png')
+
+
+def test_cache_key_palette():
+    # same palette indices with different palettes/transparency
+    a = Image.new('P', (8, 8))
+    a.putpalette([255, 0, 0] * 256)
+    b = a.copy()
+    b.putpalette([0, 0, 255] * 256)
+    assert _cache_key(a, None, 'png') != _cache_key(b, None, 'png')
+    c = a.copy()
+    c.info['transparency'] = 0
+    assert _cache_key(a, None, 'png') != _cache_key(c, None, 'png')
+
+    srcs = _encode_images([a, b])
+    assert srcs[0] != srcs[1]
+    assert _encode_images([b]) == srcs[1:]
+
+
+def test_cache_key_file_mtime(tmp_path):
+    path = str(tmp_path / 'img.png')
+    Image.fromarray(BASE_NP_IMGS[0]).save(path)
+    key = _cache_key(path, None, 'png')
+    os.utime(path, ns=(0, 0))
+    assert key != _cache_key(path, None, 'png')
+    assert _cache_key(str(tmp_path / 'missing.png')) is None
+
+
+def test_encode_images_uses_cache():
+    first = _encode_images(BASE_NP_IMGS)
+    assert ipyplot.cache_info()['misses'] == 3
+    second = _encode_images(BASE_NP_IMGS)
+    assert first == second
+    assert ipyplot.cache_info()['hits'] == 3
+
+    ipyplot.configure_cache(enabled=False)
+    _encode_images(BASE_NP_IMGS)
+    assert ipyplot.cache_info()['hits'] == 3
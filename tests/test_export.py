@@ -0,0 +1,80 @@
+import io
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (3, 32, 32, 3)), dtype=np.uint8))
+LOCAL_URLS = ["docs/example1-tabs.jpg", "docs/example2-images.jpg"]
+
+
+@pytest.mark.parametrize("tabs", [True, False])
+def test_to_html(capsys, tabs):
+    html = ipyplot.to_html(
+        BASE_NP_IMGS, ['a', 'b', 'a'], tabs=tabs, title='report')
+    assert html.startswith('<!DOCTYPE html>')
+    assert '<title>report</title>' in html
+    assert html.count('src="data:image/png;base64,') == 3
+
+    # string URLs are embedded too, so the document is standalone
+    html = ipyplot.to_html(LOCAL_URLS, ['a', 'b'], tabs=tabs)
+    assert html.count('src="data:image/') == 2
+    # nothing is displayed
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize("layout", ['grid', 'atlas'])
+def test_save_html_assets(tmp_path, layout):
+    path = str(tmp_path / 'out' / 'report.html')
+    os.makedirs(os.path.dirname(path))
+    ipyplot.save_html(
+        path, BASE_NP_IMGS * 2, assets_dir='assets', layout=layout)
+
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    assert 'data:image' not in html
+
+    assets = sorted(os.listdir(str(tmp_path / 'out' / 'assets')))
+    for name in assets:
+        assert 'assets/' + name in html
+    if layout == 'grid':
+        # duplicated images are written once
+        assert len(assets) == 3
+        assert html.count('src="assets/') == 6
+    else:
+        assert html.count('url("assets/') == 1
+
+
+def test_save_html_stream():
+    stream = io.StringIO()
+    ipyplot.save_html(stream, BASE_NP_IMGS)
+    html = stream.getvalue()
+    assert html.startswith('<!DOCTYPE html>')
+    assert html.count('src="data:image/png;base64,') == 3
+
+
+def test_to_html_without_ipython():
+    # IPython is imported only when something is actually displayed
+    code = '\n'.join([
+        'import sys',
+        'sys.modules["IPython"] = None',
+        'import numpy as np',
+        'import ipyplot',
+        'html = ipyplot.to_html([np.zeros((8, 8, 3), dtype=np.uint8)])',
+        'assert html.count("<img ") == 1',
+        'try:',
+        '    ipyplot.plot_images([np.zeros((8, 8, 3), dtype=np.uint8)])',
+        'except Exception as e:',
+        '    assert "IPython not detected" in str(e)',
+        'else:',
+        '    raise AssertionError("IPython should be required")',
+    ])
+    subprocess.run([sys.executable, '-c', code], check=True)
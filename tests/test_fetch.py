@@ -0,0 +1,132 @@
+import base64
+import http.server
+import sys
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot._fetch import _CONNECTIONS, _fetch_url, _fetch_urls
+from ipyplot._html_helpers import _create_imgs_grid
+from ipyplot._img_helpers import _encode_images
+
+
+class FlakyHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files from `docs` dir, failing the first request to `/flaky/...` paths."""  # NOQA E501
+    protocol_version = 'HTTP/1.1'
+    failed = set()
+    client_ports = []
+
+    def do_GET(self):
+        self.client_ports.append(self.client_address[1])
+        if self.path.startswith('/redirect/'):
+            self.send_response(302)
+            self.send_header('Location', self.path[len('/redirect'):])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path.startswith('/flaky/'):
+            if self.path not in self.failed:
+                self.failed.add(self.path)
+                self.send_error(503)
+                return
+            self.path = self.path[len('/flaky'):]
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server_url():
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), partial(FlakyHandler, directory='docs'))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:%d' % server.server_address[1]
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    options = ipyplot.get_options()
+    ipyplot.clear_cache()
+    yield
+    ipyplot.set_options(**options)
+    ipyplot.clear_cache()
+
+
+def test_fetch_url(server_url):
+    data = _fetch_url(server_url + '/example1-tabs.jpg')
+    with open('docs/example1-tabs.jpg', 'rb') as f:
+        assert data == f.read()
+
+    # downloaded files are cached
+    hits = ipyplot.cache_info()['hits']
+    assert _fetch_url(server_url + '/example1-tabs.jpg') == data
+    assert ipyplot.cache_info()['hits'] == hits + 1
+
+
+def test_fetch_url_retries(server_url):
+    url = server_url + '/flaky/example2-images.jpg'
+    with pytest.raises(Exception):
+        _fetch_url(url, retries=0)
+    assert len(_fetch_url(url, retries=1, backoff=0)) > 0
+
+
+def test_fetch_url_reuses_connections(server_url):
+    FlakyHandler.client_ports.clear()
+    for name in ['example1-tabs.jpg', 'example2-images.jpg']:
+        _fetch_url(server_url + '/' + name)
+    # both files are downloaded over the same keep-alive connection
+    assert len(FlakyHandler.client_ports) == 2
+    assert len(set(FlakyHandler.client_ports)) == 1
+
+
+def test_fetch_url_stale_connection(server_url):
+    _fetch_url(server_url + '/example1-tabs.jpg')
+    # connections closed by the server are replaced with new ones
+    for pool in _CONNECTIONS.values():
+        for conn in pool:
+            conn.sock.close()
+    data = _fetch_url(server_url + '/example2-images.jpg', retries=0)
+    with open('docs/example2-images.jpg', 'rb') as f:
+        assert data == f.read()
+
+
+def test_fetch_url_redirect(server_url):
+    data = _fetch_url(server_url + '/redirect/example1-tabs.jpg')
+    with open('docs/example1-tabs.jpg', 'rb') as f:
+        assert data == f.read()
+
+
+def test_fetch_urls_failures(server_url, capsys):
+    ipyplot.set_options(fetch_retries=0)
+    fetched = _fetch_urls([
+        server_url + '/example1-tabs.jpg',
+        server_url + '/missing.jpg'])
+    assert fetched[0] is not None and fetched[1] is None
+    assert "Couldn't download" in capsys.readouterr().out
+
+
+def test_encode_remote_images(server_url):
+    ipyplot.set_options(fetch_retries=0)
+    images = np.asarray([
+        server_url + '/example1-tabs.jpg',
+        server_url + '/missing.jpg'])
+    srcs = _encode_images(
+        images, force_b64=True, target_width=50, img_format='jpeg')
+    assert srcs[0].startswith('data:image/jpeg;base64,')
+    assert srcs[1] is None
+    assert base64.b64decode(srcs[0].split(',')[1])[:2] == b'\xff\xd8'
+
+    # images which couldn't be downloaded are displayed from their URLs
+    html = _create_imgs_grid(images, labels=[0, 1], force_b64=True)
+    assert html.count('<img ') == 2
+    assert 'src="%s/missing.jpg"' % server_url in html
+    # downloaded JPEG file is embedded as it is
+    assert 'src="data:image/jpeg;base64,' in html
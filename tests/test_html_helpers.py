@@ -0,0 +1,122 @@
+import re
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot import _html_helpers
+from ipyplot._html_helpers import (
+    _create_html_viewer, _create_imgs_grid, _create_tabs, _display_html,
+    _get_html_ids)
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (3, 32, 32, 3)), dtype=np.uint8))
+
+
+@pytest.fixture
+def restore_options():
+    options = ipyplot.get_options()
+    yield
+    ipyplot.set_options(**options)
+
+
+def test_html_viewer_truncates_data_uris():
+    html = _create_imgs_grid(BASE_NP_IMGS, labels=[0, 1, 2])
+    viewer = _create_html_viewer(html)
+    assert 'data:image/png;base64,...' in viewer
+    assert len(viewer) < len(html)
+
+
+def test_html_viewer_can_be_disabled(capsys, restore_options):
+    _display_html('<div>test</div>')
+    assert capsys.readouterr().out.count('HTML object') == 2
+
+    ipyplot.set_options(html_viewer=False)
+    _display_html('<div>test</div>')
+    assert capsys.readouterr().out.count('HTML object') == 1
+
+
+def test_set_options_unknown():
+    with pytest.raises(ValueError):
+        ipyplot.set_options(not_an_option=True)
+
+
+@pytest.mark.parametrize("lazy_tabs", [True, False])
+def test_create_tabs_lazy(lazy_tabs):
+    html = _create_tabs(
+        BASE_NP_IMGS, np.asarray(['a', 'b', 'c']), lazy_tabs=lazy_tabs)
+    # all tabs but the first one are deferred
+    assert html.count('<template') == (2 if lazy_tabs else 0)
+    assert html.count('onchange=') == (2 if lazy_tabs else 0)
+    assert html.count('<img ') == 3
+    first_template = html.find('<template')
+    assert first_template == -1 or html.find('<img ') < first_template
+
+
+@pytest.mark.parametrize(
+    "image, lazy_loading, expected_attrs",
+    [
+        (
+            "docs/example1-tabs.jpg", True,
+            ' loading="lazy" decoding="async"'
+        ),
+        (
+            np.zeros((20, 40, 3), dtype=np.uint8), True,
+            ' loading="lazy" decoding="async" width="100" height="50"'
+        ),
+        (np.zeros((20, 40, 3), dtype=np.uint8), False, ''),
+    ])
+def test_create_imgs_grid_lazy_loading(image, lazy_loading, expected_attrs):
+    html = _create_imgs_grid(
+        [image], labels=[0], img_width=100, lazy_loading=lazy_loading)
+    assert '%s/>' % expected_attrs in html
+    assert html.count('loading="lazy"') == (1 if lazy_loading else 0)
+
+
+@pytest.mark.parametrize("layout", ['grid', 'atlas'])
+def test_create_tabs_style_emitted_once(layout):
+    html = _create_tabs(
+        BASE_NP_IMGS, np.asarray(['a', 'b', 'c']), img_width=120,
+        zoom_scale=3, layout=layout)
+    assert html.count('div.ipyplot-imgs-container-div {') == 1
+    # grid specific params are set on containers
+    assert html.count('--ipyplot-img-width: 120px; --ipyplot-zoom-scale: 3;') == 3  # NOQA E501
+
+
+def test_create_tabs_unique_ids():
+    html = _create_tabs(
+        BASE_NP_IMGS * 2, np.asarray(['a', 'b', 'c', 'a', 'b', 'c']))
+    ids = re.findall(r' id="([^"]+)"', html)
+    assert len(ids) == len(set(ids)) == 3 + 3 + 6
+    # all ids share a single per-output prefix
+    prefix = re.search(r'name="tabs-(\w+)-0"', html).group(1)
+    assert all(prefix + '-' in i for i in ids)
+
+
+def test_get_html_ids():
+    html_ids = _get_html_ids()
+    prefix = next(html_ids)[:-2]
+    assert [next(html_ids) for _ in range(2)] == [
+        prefix + '-1', prefix + '-2']
+    assert not next(_get_html_ids()).startswith(prefix)
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_display_imgs_grid_progressive(displayed, restore_options, n_jobs):
+    ipyplot.set_options(html_viewer=False)
+    updates = displayed
+    images = BASE_NP_IMGS * 4
+    _html_helpers._display_imgs_grid_progressive(
+        images, labels=list(range(12)), max_images=12, chunk_size=2,
+        n_jobs=n_jobs)
+
+    # skeleton and chunks of 2, 4 and 6 images
+    assert len(updates) == 4
+    assert [u.count(_html_helpers._PLACEHOLDER_SRC) for u in updates] == [
+        12, 10, 6, 0]
+    # element ids are kept the same between updates
+    assert len({tuple(re.findall(r' id="([^"]+)"', u)) for u in updates}) == 1
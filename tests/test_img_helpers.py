@@ -0,0 +1,261 @@
+import base64
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot._atlas import _create_thumbnail
+from ipyplot._img_helpers import (
+    _downscale_batch, _encode_images, _get_resize_width, _img_to_base64,
+    _img_to_data_uri, _normalize_to_uint8)
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (5, 64, 64, 3)), dtype=np.uint8))
+
+MIXED_IMGS = [
+    BASE_NP_IMGS[0],
+    "docs/example2-images.jpg",
+    Image.fromarray(BASE_NP_IMGS[1]),
+    "https://raw.githubusercontent.com/karolzak/boxdetect/master/images/example1.png",  # NOQA E501
+    BASE_NP_IMGS[2],
+]
+
+
+# remote images are served from a local file (see conftest.py)
+pytestmark = pytest.mark.usefixtures('offline_fetch')
+
+
+@pytest.mark.parametrize(
+    "n_jobs, parallel_backend",
+    [
+        (2, 'thread'),
+        (-1, 'thread'),
+        (2, 'process'),
+        (None, ThreadPoolExecutor(max_workers=2)),
+    ])
+def test_encode_images_parallel_matches_serial(n_jobs, parallel_backend):
+    serial = _encode_images(MIXED_IMGS, force_b64=True, target_width=32)
+    parallel = _encode_images(
+        MIXED_IMGS, force_b64=True, target_width=32,
+        n_jobs=n_jobs, parallel_backend=parallel_backend)
+    assert parallel == serial
+
+
+def test_encode_images_skips_urls():
+    srcs = _encode_images(MIXED_IMGS, force_b64=False)
+    assert srcs[1] is None and srcs[3] is None
+    assert all(
+        srcs[i].startswith('data:image/png;base64,') for i in [0, 2, 4])
+
+
+def test_encode_images_invalid_backend():
+    with pytest.raises(ValueError):
+        _encode_images(BASE_NP_IMGS, n_jobs=2, parallel_backend='gpu')
+
+
+@pytest.mark.parametrize(
+    "resize, hidpi_scale, expected",
+    [
+        (None, 1.0, None),
+        ('off', 2.0, None),
+        (False, 1.0, None),
+        ('width', 1.0, 100),
+        (True, 1.0, 100),
+        ('width', 2.0, 200),
+        ('zoom', 1.0, 250),
+        ('zoom', 1.5, 375),
+    ])
+def test_get_resize_width(resize, hidpi_scale, expected):
+    assert _get_resize_width(resize, 100, 2.5, hidpi_scale) == expected
+
+
+def test_get_resize_width_invalid():
+    with pytest.raises(ValueError):
+        _get_resize_width('huge', 100)
+    with pytest.raises(ValueError, match="`img_width` can't be `None`!"):
+        _get_resize_width('zoom', None)
+
+
+@pytest.mark.parametrize(
+    "target_width, expected_width",
+    [(None, 64), (32, 32), (128, 64)])
+def test_img_to_base64_downscales_only(target_width, expected_width):
+    b64 = _img_to_base64(BASE_NP_IMGS[0], target_width)
+    img = Image.open(io.BytesIO(base64.b64decode(b64)))
+    assert img.size[0] == expected_width
+
+
+FEW_COLORS_IMG = np.zeros((64, 64, 3), dtype=np.uint8)
+FEW_COLORS_IMG[16:48, 16:48] = 255
+RGBA_IMG = Image.fromarray(BASE_NP_IMGS[0]).convert('RGBA')
+
+
+@pytest.mark.parametrize(
+    "image, img_format, expected_mime",
+    [
+        (BASE_NP_IMGS[0], 'png', 'image/png'),
+        (BASE_NP_IMGS[0], 'jpeg', 'image/jpeg'),
+        (BASE_NP_IMGS[0], 'JPG', 'image/jpeg'),
+        (BASE_NP_IMGS[0], 'webp', 'image/webp'),
+        (BASE_NP_IMGS[0], 'auto', 'image/jpeg'),
+        (FEW_COLORS_IMG, 'auto', 'image/png'),
+        (RGBA_IMG, 'auto', 'image/png'),
+        (RGBA_IMG, 'jpeg', 'image/jpeg'),
+        (RGBA_IMG.convert('P'), 'webp', 'image/webp'),
+    ])
+def test_img_to_data_uri_formats(image, img_format, expected_mime):
+    uri = _img_to_data_uri(image, img_format=img_format, quality=80)
+    header, b64 = uri.split(',', 1)
+    assert header == 'data:%s;base64' % expected_mime
+    img = Image.open(io.BytesIO(base64.b64decode(b64)))
+    assert img.get_format_mimetype() == expected_mime
+
+
+def test_img_to_data_uri_invalid_format():
+    with pytest.raises(ValueError):
+        _img_to_data_uri(BASE_NP_IMGS[0], img_format='bmp')
+
+
+@pytest.mark.parametrize(
+    "image, kwargs, expected",
+    [
+        (np.array([[0, 128, 255]], dtype=np.uint8), {}, [0, 128, 255]),
+        (np.array([[0.0, 0.5, 1.0]]), {}, [0, 127, 255]),
+        (np.array([[0.0, 100.0, 300.0]], dtype=np.float32), {}, [0, 100, 255]),
+        (np.array([[False, True]]), {}, [0, 255]),
+        (np.array([[0, 256, 65535]], dtype=np.uint16), {}, [0, 1, 255]),
+        (np.array([[-5, 100, 1000]], dtype=np.int32), {}, [0, 100, 255]),
+        (np.array([[-1.0, 0.0, 1.0]]), {'vmin': -1, 'vmax': 1}, [0, 127, 255]),
+        (np.array([[0, 10, 20]]), {'vmax': 20}, [0, 127, 255]),
+        (np.arange(101.0)[None], {'percentiles': (10, 90)}, None),
+    ])
+def test_normalize_to_uint8_dtypes(image, kwargs, expected):
+    out = _normalize_to_uint8(image, **kwargs)
+    assert out.dtype == np.uint8
+    if expected is not None:
+        assert out.tolist() == [expected]
+    else:
+        assert out[0, 10] == 0 and out[0, 90] == 255
+
+
+@pytest.mark.parametrize(
+    "shape, expected_shape",
+    [
+        ((16, 24), (16, 24)),
+        ((16, 24, 1), (16, 24)),
+        ((16, 24, 3), (16, 24, 3)),
+        ((3, 16, 24), (16, 24, 3)),
+        ((1, 16, 24), (16, 24)),
+    ])
+def test_normalize_to_uint8_layouts(shape, expected_shape):
+    out = _normalize_to_uint8(np.zeros(shape, dtype=np.float32))
+    assert out.shape == expected_shape
+    # every layout can be encoded
+    assert _img_to_base64(np.zeros(shape, dtype=np.float32))
+
+
+def test_normalize_images_batch():
+    batch = np.random.rand(4, 3, 16, 24).astype(np.float32)
+    out = ipyplot.normalize_images(batch)
+    assert out.shape == (4, 16, 24, 3) and out.dtype == np.uint8
+    for i in range(4):
+        assert (out[i] == _normalize_to_uint8(batch[i])).all()
+
+
+def test_downscale_batch():
+    batch = np.random.randint(0, 255, (2, 9, 12, 3)).astype(np.uint8)
+    out = _downscale_batch(batch, 5)
+    # integer factor 2, last row is cropped
+    assert out.shape == (2, 4, 6, 3)
+    expected = batch[:, :8].reshape(2, 4, 2, 6, 2, 3).mean(axis=(2, 4))
+    assert np.abs(out - expected).max() <= 0.5
+    assert _downscale_batch(batch, 8) is batch
+
+
+@pytest.mark.parametrize("shape", [(6, 64, 96, 3), (6, 64, 96), (6, 3, 64, 96)])
+@pytest.mark.parametrize("n_jobs, parallel_backend", [(None, 'thread'), (2, 'process')])
+def test_encode_images_batch(tmp_path, shape, n_jobs, parallel_backend):
+    path = str(tmp_path / 'batch.npy')
+    np.save(path, np.random.rand(*shape).astype(np.float32))
+    batch = np.load(path, mmap_mode='r')
+
+    srcs = _encode_images(
+        batch[:4], target_width=20,
+        n_jobs=n_jobs, parallel_backend=parallel_backend)
+    assert len(srcs) == 4
+    for src in srcs:
+        b64 = src.split(',', 1)[1]
+        img = Image.open(io.BytesIO(base64.b64decode(b64)))
+        assert img.size == (20, 13)
+
+
+def test_encode_images_batch_cache():
+    # pre-downscaled batch results must not be served to serial calls
+    ipyplot.clear_cache()
+    batch = np.random.randint(0, 255, (3, 60, 80, 3)).astype(np.uint8)
+    ipyplot.configure_cache(enabled=False)
+    expected = _encode_images(batch, target_width=20)
+    ipyplot.configure_cache(enabled=True)
+    _encode_images(batch, target_width=20, n_jobs=2, parallel_backend='process')
+    assert _encode_images(batch, target_width=20) == expected
+    ipyplot.clear_cache()
+
+
+@pytest.mark.parametrize("target_width", [None, 2000])
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_img_to_data_uri_passthrough(target_width, as_bytes):
+    path = 'docs/example1-tabs.jpg'
+    with open(path, 'rb') as f:
+        data = f.read()
+    uri = _img_to_data_uri(data if as_bytes else path, target_width)
+    # file is embedded as it is
+    assert uri == 'data:image/jpeg;base64,' + base64.b64encode(data).decode()
+
+    # explicitly chosen format is always applied
+    uri = _img_to_data_uri(
+        data if as_bytes else path, target_width, img_format='png')
+    assert uri.startswith('data:image/png;base64,')
+
+
+def test_img_to_data_uri_reencodes(tmp_path):
+    # formats not displayed natively by browsers are re-encoded
+    path = str(tmp_path / 'img.bmp')
+    Image.fromarray(BASE_NP_IMGS[0]).save(path)
+    assert _img_to_data_uri(path).startswith('data:image/png;base64,')
+
+    # downscaled JPEG is decoded at reduced scale and resized to exact width
+    uri = _img_to_data_uri('docs/example1-tabs.jpg', 200, img_format='jpeg')
+    img = Image.open(io.BytesIO(base64.b64decode(uri.split(',')[1])))
+    assert img.size[0] == 200
+
+
+def test_encode_image_keeps_caller_images():
+    # lazily opened images provided by the caller are not decoded at reduced scale  # NOQA E501
+    image = Image.open('docs/example1-tabs.jpg')
+    size = image.size
+    _img_to_data_uri(image, 200, img_format='jpeg')
+    _create_thumbnail(image, 200)
+    assert image.size == size
+    image.load()
+    assert image.size == size
+
+
+@pytest.mark.parametrize(
+    "image, expected_mime",
+    [
+        (np.random.randint(0, 65535, (32, 32), dtype=np.uint16), 'image/jpeg'),  # NOQA E501
+        (np.zeros((32, 32), dtype=np.uint16), 'image/png'),
+    ])
+def test_img_to_data_uri_auto_16bit(tmp_path, image, expected_mime):
+    path = str(tmp_path / 'img16.png')
+    Image.fromarray(image).save(path)
+    assert Image.open(path).mode == 'I;16'
+    html = ipyplot.to_html([path], force_b64=True, img_format='auto')
+    assert 'data:%s;base64,' % expected_mime in html
@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+
+HEAVY_MODULES = ['numpy', 'PIL.Image', 'IPython', 'shortuuid']
+
+
+def _run(code: str):
+    # fresh interpreter, so modules imported by other tests don't count
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        check=True, capture_output=True, text=True).stdout
+
+
+def test_import_is_lazy():
+    code = '\n'.join([
+        'import sys',
+        'import ipyplot',
+        'print(",".join(m for m in %r if m in sys.modules))' % HEAVY_MODULES,
+    ])
+    assert _run(code).strip() == ''
+
+
+def test_import_time():
+    code = '\n'.join([
+        'import time',
+        'start = time.perf_counter()',
+        'import ipyplot',
+        'print(time.perf_counter() - start)',
+    ])
+    # loose bound guarding against eager imports of heavy dependencies
+    assert min(float(_run(code)) for _ in range(3)) < 0.2
+
+
+def test_pil_not_imported_for_urls():
+    # string URLs displayed directly don't need any image conversion
+    code = '\n'.join([
+        'import sys',
+        'import ipyplot',
+        'ipyplot.to_html(["docs/example1-tabs.jpg", "http://x/y.png"], force_b64=False)',  # NOQA E501
+        'print("PIL.Image" in sys.modules)',
+    ])
+    assert _run(code).strip() == 'False'
+
+
+@pytest.mark.parametrize("name", ipyplot.__all__)
+def test_lazy_attributes(name):
+    assert callable(getattr(ipyplot, name))
+    assert name in dir(ipyplot)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        ipyplot.not_existing_function
@@ -0,0 +1,80 @@
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot import _pager
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (10, 16, 16, 3)), dtype=np.uint8))
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_pager_browsing(displayed, prefetch):
+    pager = ipyplot.Pager(
+        BASE_NP_IMGS, labels=['label%d' % i for i in range(10)],
+        page_size=4, prefetch=prefetch)
+    assert pager.n_pages == 3
+
+    pager.show()
+    pager.next()
+    pager.next()
+    pager.next()
+    pager.prev()
+    assert pager.page == 1
+    assert len(displayed) == 5
+    assert [out.count('<img ') for out in displayed] == [4, 4, 2, 2, 4]
+    assert 'label9' in displayed[2] and 'label3' not in displayed[2]
+    assert 'Page 3/3 (images 9-10 of 10)' in displayed[2]
+    assert 'Page 1/3 (images 1-4 of 10)' in displayed[0]
+
+    with pytest.raises(ValueError):
+        pager.goto(3)
+
+
+def test_pager_prefetch(displayed, monkeypatch):
+    ipyplot.clear_cache()
+    pages = []
+    encode_page = _pager.Pager._encode_page
+
+    def tracked_encode_page(self, page):
+        pages.append(page)
+        return encode_page(self, page)
+
+    monkeypatch.setattr(_pager.Pager, '_encode_page', tracked_encode_page)
+    pager = ipyplot.Pager(BASE_NP_IMGS, page_size=4)
+    pager.show()
+    pager.next()
+    # each page is converted only once, the next one in the background
+    assert pager._prefetched[0] == 2
+    pager._prefetched[1].result()
+    assert pages == [0, 1, 2]
+
+    # moving back reuses cached conversions
+    misses = ipyplot.cache_info()['misses']
+    pager.prev()
+    assert ipyplot.cache_info()['misses'] == misses
+
+
+def test_pager_not_indexable():
+    with pytest.raises(ValueError):
+        ipyplot.Pager(iter(BASE_NP_IMGS))
+
+
+def test_pager_close(displayed):
+    with ipyplot.Pager(BASE_NP_IMGS, page_size=4) as pager:
+        pager.show()
+        executor = pager._executor
+        assert executor is not None
+    assert pager._executor is None and pager._prefetched is None
+    assert executor._shutdown
+
+    # pager still works after closing
+    pager.next()
+    assert 'Page 2/3' in displayed[-1]
+    pager.close()
+    assert pager._executor is None
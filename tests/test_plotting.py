@@ -11,6 +11,7 @@ from PIL import Image
 sys.path.append(".")
 sys.path.append("../.")
 import ipyplot
+from conftest import LazyDataset
 
 
 BASE_NP_IMGS = list(np.asarray(
@@ -55,6 +56,10 @@ TEST_DATA = [
 ]
 
 
+# remote images are served from a local file (see conftest.py)
+pytestmark = pytest.mark.usefixtures('offline_fetch')
+
+
 @pytest.fixture(params=[True, False])
 def test_true_false(request):
     return request.param
@@ -73,8 +78,6 @@ def test_plot_images(
         img_width=300,
         force_b64=test_true_false)
     captured = capsys.readouterr()
-    if test_true_false and type(imgs[0]) is np.str_ and "http" in imgs[0]:
-        assert("Ignoring 'force_b64' flag" in captured.out)
 
     assert(str(HTML).split("'")[1] in captured.out)
 
@@ -91,8 +94,6 @@ def test_plot_class_tabs(
         img_width=300,
         force_b64=test_true_false)
     captured = capsys.readouterr()
-    if test_true_false and type(imgs[0]) is np.str_ and "http" in imgs[0]:
-        assert("Ignoring 'force_b64' flag" in captured.out)
 
     assert(str(HTML).split("'")[1] in captured.out)
 
@@ -108,7 +109,79 @@ def test_plot_class_representations(
         img_width=300,
         force_b64=test_true_false)
     captured = capsys.readouterr()
-    if test_true_false and type(imgs[0]) is np.str_ and "http" in imgs[0]:
-        assert("Ignoring 'force_b64' flag" in captured.out)
 
     assert(str(HTML).split("'")[1] in captured.out)
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_plot_functions_n_jobs(capsys, n_jobs):
+    ipyplot.plot_images(
+        BASE_NP_IMGS, force_b64=True, n_jobs=n_jobs)
+    ipyplot.plot_class_tabs(
+        BASE_NP_IMGS, LABELS[1], force_b64=True, n_jobs=n_jobs)
+    ipyplot.plot_class_representations(
+        BASE_NP_IMGS, LABELS[1], force_b64=True, n_jobs=n_jobs)
+    captured = capsys.readouterr()
+    assert(str(HTML).split("'")[1] in captured.out)
+
+
+@pytest.mark.parametrize("layout", ['grid', 'atlas'])
+def test_plot_functions_progressive(capsys, layout):
+    ipyplot.plot_images(
+        BASE_NP_IMGS, progressive=True, layout=layout)
+    ipyplot.plot_class_representations(
+        BASE_NP_IMGS, LABELS[1], progressive=True, layout=layout)
+    captured = capsys.readouterr()
+    assert(str(HTML).split("'")[1] in captured.out)
+
+
+@pytest.mark.parametrize("sample", ['first', 'random', 'stratified'])
+def test_plot_functions_sample(capsys, sample):
+    ipyplot.plot_images(
+        iter(BASE_NP_IMGS), LABELS[1], max_images=2, sample=sample, seed=0)
+    ipyplot.plot_class_tabs(
+        BASE_NP_IMGS, LABELS[1], max_imgs_per_tab=1, sample=sample, seed=0)
+    captured = capsys.readouterr()
+    assert(str(HTML).split("'")[1] in captured.out)
+
+    with pytest.raises(ValueError):
+        ipyplot.plot_images(BASE_NP_IMGS, sample='shuffle')
+
+
+def test_plot_functions_series_index(capsys):
+    # labels from e.g. filtered DataFrame column don't have index starting at 0
+    imgs = BASE_NP_IMGS * 2
+    labels = pd.Series(list('abcabc'), index=range(10, 16))
+    ipyplot.plot_class_representations(imgs, labels)
+    ipyplot.plot_images(imgs, labels, max_images=3, sample='stratified')
+    html = ipyplot.to_html(imgs, labels, tabs=True)
+    assert html.count('<img ') == 6
+    captured = capsys.readouterr()
+    assert(str(HTML).split("'")[1] in captured.out)
+
+
+def test_plot_functions_lazy_inputs(capsys, tmp_path):
+    imgs = BASE_NP_IMGS * 10
+    labels = ['a', 'b', 'c'] * 10
+    ipyplot.plot_images(
+        LazyDataset(imgs, allowed=range(5)), labels=iter(labels),
+        max_images=5)
+    ipyplot.plot_images(iter(imgs), max_images=5)
+    ipyplot.plot_class_tabs(
+        LazyDataset(imgs, allowed=range(6)), labels=labels,
+        max_imgs_per_tab=2)
+    ipyplot.plot_class_tabs(iter(imgs), labels=iter(labels))
+    ipyplot.plot_class_representations(
+        LazyDataset(imgs, allowed=range(3)), labels=labels)
+
+    path = str(tmp_path / 'imgs.npy')
+    np.save(path, np.asarray(imgs))
+    ipyplot.plot_images(np.load(path, mmap_mode='r'), max_images=5)
+
+    captured = capsys.readouterr()
+    assert(str(HTML).split("'")[1] in captured.out)
+
+
+def test_plot_images_no_img_width():
+    with pytest.raises(ValueError, match="`img_width` can't be `None`!"):
+        ipyplot.plot_images(BASE_NP_IMGS, img_width=None)
@@ -0,0 +1,105 @@
+import logging
+import re
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(".")
+sys.path.append("../.")
+import ipyplot
+from ipyplot._profiling import _PROFILES, _STAGES
+
+
+BASE_NP_IMGS = list(np.asarray(
+    np.random.randint(0, 255, (6, 32, 32, 3)), dtype=np.uint8))
+LABELS = ['a', 'b', 'c', 'a', 'b', 'c']
+LOCAL_URLS = ["docs/example1-tabs.jpg", "docs/example2-images.jpg"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    ipyplot.clear_cache()
+    yield
+    ipyplot.clear_cache()
+
+
+@pytest.mark.parametrize("tabs", [True, False])
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_profile_stats(tabs, n_jobs):
+    with ipyplot.profile() as stats:
+        html = ipyplot.to_html(
+            BASE_NP_IMGS, LABELS, tabs=tabs, n_jobs=n_jobs)
+
+    assert set(stats['stages']) == set(_STAGES)
+    assert stats['stages']['encode'] > 0
+    assert stats['stages']['html'] > 0
+    if tabs:
+        assert stats['stages']['grouping'] > 0
+    if n_jobs is None:
+        # nested stages are not counted twice
+        # (times of parallel workers are summed, so they can exceed it)
+        assert sum(stats['stages'].values()) <= stats['total_time']
+
+    assert stats['images'] == 6
+    assert stats['converted'] == 6
+    assert stats['cache_hits'] == 0
+    assert stats['embedded_images'] == 6
+    assert stats['embedded_bytes'] == sum(
+        len(src) for src in re.findall(r'src="(data:image/png[^"]+)"', html))
+    assert stats['bytes_per_image'] == stats['embedded_bytes'] / 6
+    assert 0 < stats['max_image_bytes'] <= stats['embedded_bytes']
+    assert stats['embedded_bytes'] < stats['output_bytes'] < len(html)
+    assert not _PROFILES
+
+
+def test_profile_cache_hits():
+    ipyplot.to_html(BASE_NP_IMGS)
+    with ipyplot.profile() as stats:
+        ipyplot.to_html(BASE_NP_IMGS)
+    assert stats['converted'] == 0
+    assert stats['cache_hits'] == 6
+    assert stats['stages']['encode'] == 0
+
+
+def test_profile_urls():
+    # images displayed from URLs are neither converted nor embedded
+    with ipyplot.profile() as stats:
+        ipyplot.to_html(LOCAL_URLS, force_b64=False)
+    assert stats['images'] == 2
+    assert stats['converted'] == 0
+    assert stats['embedded_images'] == 0
+    assert stats['bytes_per_image'] == 0
+    assert stats['output_bytes'] > 0
+
+
+def test_profile_nested():
+    with ipyplot.profile() as outer:
+        ipyplot.to_html(BASE_NP_IMGS[:2])
+        with ipyplot.profile() as inner:
+            ipyplot.to_html(BASE_NP_IMGS[2:])
+    assert inner['images'] == 4
+    assert outer['images'] == 6
+
+
+def test_profile_callback_and_logging(caplog):
+    received = []
+    with caplog.at_level(logging.INFO, logger='ipyplot'):
+        with ipyplot.profile(callback=received.append, logger='ipyplot') \
+                as stats:
+            ipyplot.to_html(BASE_NP_IMGS)
+
+    assert received == [stats]
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert record.ipyplot_profile is stats
+    assert 'IPyPlot profile: total' in record.getMessage()
+    assert '6 images (6 converted, 0 from cache)' in record.getMessage()
+
+
+def test_profile_exception():
+    with pytest.raises(ValueError):
+        with ipyplot.profile() as stats:
+            ipyplot.to_html(BASE_NP_IMGS, layout='wrong')
+    assert not _PROFILES
+    assert 'total_time' in stats
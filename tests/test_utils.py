@@ -6,7 +6,11 @@ import pandas as pd
 
 sys.path.append(".")
 sys.path.append("../.")
-from ipyplot._utils import _get_class_representations
+from conftest import LazyDataset
+from ipyplot._utils import (
+    _get_class_representations, _get_stratified_quotas, _group_indices_by_label,
+    _reservoir_sample, _reservoir_sample_positions, _sample, _take,
+    _take_first)
 
 
 TEST_OUT_IMAGES = ['a', 'b', 'c']
@@ -104,3 +108,151 @@ def test_get_class_representations(
         labels_order=labels_order)
     assert all(images == out_images)
     assert all(labels == out_labels)
+
+
+SEQ = ['a', 'b', 'c', 'd', 'e']
+
+
+@pytest.mark.parametrize(
+    "seq",
+    [SEQ, np.asarray(SEQ), pd.Series(SEQ, index=[5, 4, 3, 2, 1])])
+def test_take_sequences(seq):
+    assert list(_take_first(seq, 2)) == ['a', 'b']
+    assert list(_take_first(seq, 10)) == SEQ
+    assert list(_take(seq, [3, 0, 3])) == ['d', 'a', 'd']
+
+
+def test_take_lazy_dataset():
+    dataset = LazyDataset(SEQ)
+    assert list(_take_first(dataset, 2)) == ['a', 'b']
+    assert list(_take(dataset, [4, 1])) == ['e', 'b']
+    assert dataset.accessed == [0, 1, 4, 1]
+
+
+def test_take_iterator():
+    assert _take_first(iter(SEQ), 3) == ['a', 'b', 'c']
+    consumed = []
+
+    def gen():
+        for x in SEQ:
+            consumed.append(x)
+            yield x
+
+    assert _take(gen(), [2, 0]) == ['c', 'a']
+    assert consumed == ['a', 'b', 'c']
+    assert _take(gen(), []) == []
+
+
+@pytest.mark.parametrize(
+    "labels, labels_order, max_per_label, out_order, out_groups",
+    [
+        (
+            ['b', 'a', 'b', 'c', 'a', 'b'], None, None,
+            ['a', 'b', 'c'], [[1, 4], [0, 2, 5], [3]]
+        ),
+        (
+            ['b', 'a', 'b', 'c', 'a', 'b'], None, 2,
+            ['a', 'b', 'c'], [[1, 4], [0, 2], [3]]
+        ),
+        (
+            pd.Series([2, 1, 2, 3, 1, 2]), [3, 4, 2], 1,
+            [3, 4, 2], [[3], [], [0]]
+        ),
+    ])
+def test_group_indices_by_label(
+        labels, labels_order, max_per_label, out_order, out_groups):
+    order, groups = _group_indices_by_label(
+        labels, labels_order, max_per_label)
+    assert list(order) == out_order
+    assert [list(group) for group in groups] == out_groups
+
+
+def test_group_indices_by_label_matches_masking():
+    labels = np.random.randint(0, 50, 10000)
+    order, groups = _group_indices_by_label(labels, max_per_label=30)
+    for label, group in zip(order, groups):
+        assert list(group) == list(np.where(labels == label)[0][:30])
+
+
+def test_get_class_representations_matches_naive():
+    labels = np.random.randint(0, 500, 20000)
+    images = np.arange(len(labels))
+    labels_order = np.random.permutation(600)
+    ignore_labels = [0, 1, 2]
+    out_images, out_labels = _get_class_representations(
+        images, labels, ignore_labels, labels_order)
+
+    expected = [
+        (np.where(labels == label)[0][0], label)
+        for label in labels_order
+        if label not in ignore_labels and np.any(labels == label)]
+    assert list(out_images) == [img for img, _ in expected]
+    assert list(out_labels) == [label for _, label in expected]
+
+
+@pytest.mark.parametrize(
+    "sample_func",
+    [
+        lambda rng: _reservoir_sample_positions(20, 5, rng),
+        lambda rng: _reservoir_sample(iter(range(20)), 5, rng)[0],
+    ])
+def test_reservoir_sample_uniform(sample_func):
+    rng = np.random.default_rng(0)
+    counts = np.zeros(20)
+    for _ in range(4000):
+        positions = sample_func(rng)
+        assert len(set(positions)) == 5
+        assert list(positions) == sorted(positions)
+        counts[positions] += 1
+    # each position is selected with 5/20 probability
+    assert np.all(np.abs(counts / 4000 - 0.25) < 0.04)
+
+
+def test_reservoir_sample_short_input():
+    rng = np.random.default_rng(0)
+    assert list(_reservoir_sample_positions(3, 5, rng)) == [0, 1, 2]
+    assert _reservoir_sample(iter('abc'), 5, rng)[1] == ['a', 'b', 'c']
+    assert list(_reservoir_sample_positions(10 ** 15, 0, rng)) == []
+
+
+@pytest.mark.parametrize(
+    "counts, k, expected",
+    [
+        ([90, 9, 1], 10, [9, 1, 0]),
+        ([5, 5, 5], 10, [4, 3, 3]),
+        ([2, 1], 10, [2, 1]),
+    ])
+def test_get_stratified_quotas(counts, k, expected):
+    assert list(_get_stratified_quotas(counts, k)) == expected
+
+
+@pytest.mark.parametrize("seq_type", [list, iter])
+@pytest.mark.parametrize("sample", ['first', 'random', 'stratified'])
+def test_sample(seq_type, sample):
+    labels = np.asarray([0] * 50 + [1] * 50)
+    indices, elements = _sample(
+        seq_type(range(100)), 10, labels, sample, seed=42)
+    assert list(indices) == list(elements)
+    assert len(indices) == 10
+    if sample == 'first':
+        assert list(indices) == list(range(10))
+    if sample == 'stratified':
+        assert np.bincount(labels[indices]).tolist() == [5, 5]
+    # the same seed gives the same sample
+    seq = list(range(100))
+    assert list(_sample(seq, 10, labels, sample, seed=42)[0]) == list(indices)
+
+
+def test_sample_unknown_method():
+    with pytest.raises(ValueError):
+        _sample([1, 2, 3], 2, sample='shuffle')
+
+
+def test_group_indices_by_label_random():
+    labels = np.asarray(['a', 'b'] * 50)
+    _, groups = _group_indices_by_label(
+        labels, max_per_label=5, sample='random', seed=0)
+    for label, group in zip(['a', 'b'], groups):
+        assert len(group) == 5
+        assert np.all(labels[group] == label)
+        assert list(group) == sorted(group)